@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Report generation benchmark
+
+Builds synthetic results and times generate_report for each format and
+for '-o all'.
+
+Usage: python3 benchmarks/report_benchmark.py --hosts 1000000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from modules.report import generate_report
+
+
+def build_results(total_hosts, target_count):
+    """
+    Synthetic results: every subdomain is live, 1 in 10 hosts has
+    open ports and a header analysis
+    """
+    targets = [f"target{i}.example" for i in range(target_count)]
+    results = {
+        'targets': targets,
+        'subdomains': {},
+        'live_hosts': {},
+        'ports': {},
+        'headers': {},
+        'timestamp': 'bench'
+    }
+    per_target = max(1, total_hosts // target_count)
+    
+    for target in targets:
+        names = [f"host{j}.{target}" for j in range(per_target)]
+        results['subdomains'][target] = names
+        results['live_hosts'][target] = [{
+            'url': f"https://{name}",
+            'status_code': 200,
+            'title': 'Example Domain',
+            'tech': ['Nginx', 'PHP'],
+            'content_length': 1256,
+            'host': '203.0.113.10',
+            'location': ''
+        } for name in names]
+        results['ports'][target] = {
+            name: [{'port': 443, 'protocol': 'tcp', 'service': 'https'}] for name in names[::10]
+        }
+        results['headers'][target] = {
+            f"https://{name}": {
+                'status_code': 200,
+                'headers_found': {'HSTS': 'max-age=31536000'},
+                'headers_missing': ['CSP', 'X-Frame-Options'],
+                'security_score': 5,
+                'recommendations': ['Add CSP header', 'Add X-Frame-Options header']
+            } for name in names[::10]
+        }
+    
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ReconX report generation')
+    parser.add_argument('--hosts', type=int, default=1000000, help='Total live hosts (default: 1000000)')
+    parser.add_argument('--targets', type=int, default=100, help='Number of targets (default: 100)')
+    parser.add_argument('--workers', type=int, help='Parallel workers for -o all (default: one per CPU)')
+    args = parser.parse_args()
+    
+    print(f"[*] Building results: {args.hosts} live hosts across {args.targets} targets...")
+    results = build_results(args.hosts, args.targets)
+    
+    with tempfile.TemporaryDirectory() as output_dir:
+        for fmt in ('txt', 'json', 'csv', 'all'):
+            start = time.perf_counter()
+            generate_report(results, output_dir, fmt, 'bench', workers=args.workers)
+            print(f"    {fmt:<5} {time.perf_counter() - start:8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Compressed, seekable result archives
+
+Results are written as one gzip member per target and stage, appended to
+a single .jsonl.gz file. Each member decompresses on its own, so a small
+JSONL index of byte offsets is enough to read one target's results
+without touching the rest of the run.
+"""
+
+import gzip
+import json
+from pathlib import Path
+
+
+STAGES = ('subdomains', 'live_hosts', 'ports', 'headers')
+
+
+class ResultArchive:
+    """
+    Append-only writer for per-target, per-stage result segments
+    """
+
+    def __init__(self, output_dir, timestamp, targets):
+        self.path = Path(output_dir) / f"results_{timestamp}.jsonl.gz"
+        self.index_path = Path(output_dir) / f"results_{timestamp}.idx"
+        
+        with open(self.index_path, 'w') as f:
+            f.write(json.dumps({
+                'archive': self.path.name,
+                'timestamp': timestamp,
+                'targets': targets
+            }) + "\n")
+
+    def write(self, target, stage, data):
+        """
+        Append one segment holding a stage's results for a target
+        Lists are stored one item per line, dicts one [key, value] pair per line
+        """
+        if isinstance(data, dict):
+            kind = 'dict'
+            rows = data.items()
+        else:
+            kind = 'list'
+            rows = data
+        
+        lines = [json.dumps(row, separators=(',', ':')) for row in rows]
+        payload = ("\n".join(lines) + "\n").encode() if lines else b""
+        member = gzip.compress(payload)
+        
+        with open(self.path, 'ab') as f:
+            offset = f.tell()
+            f.write(member)
+        
+        with open(self.index_path, 'a') as f:
+            f.write(json.dumps({
+                'target': target,
+                'stage': stage,
+                'type': kind,
+                'offset': offset,
+                'length': len(member),
+                'count': len(lines)
+            }) + "\n")
+
+    def __str__(self):
+        return str(self.path)
+
+
+class ArchiveReader:
+    """
+    Random-access reader for archives written by ResultArchive
+    Accepts either the .jsonl.gz file or its .idx file
+    """
+
+    def __init__(self, path):
+        path = Path(path)
+        if path.suffix == '.idx':
+            self.index_path = path
+        else:
+            self.index_path = path.with_name(path.name.replace('.jsonl.gz', '.idx'))
+        
+        self.segments = {}
+        
+        with open(self.index_path, 'r') as f:
+            header = json.loads(f.readline())
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self.segments.setdefault(entry['target'], {})[entry['stage']] = entry
+        
+        self.path = self.index_path.with_name(header['archive'])
+        self.timestamp = header['timestamp']
+        self.targets = header['targets']
+
+    def stages(self, target):
+        """
+        Returns list of stages stored for a target
+        """
+        return list(self.segments.get(target, {}))
+
+    def read(self, target, stage):
+        """
+        Read a single stage's results for a target
+        Returns None if the archive has no such segment
+        """
+        entry = self.segments.get(target, {}).get(stage)
+        if entry is None:
+            return None
+        
+        with open(self.path, 'rb') as f:
+            f.seek(entry['offset'])
+            member = f.read(entry['length'])
+        
+        rows = [json.loads(line) for line in gzip.decompress(member).decode().splitlines() if line]
+        
+        if entry['type'] == 'dict':
+            return {key: value for key, value in rows}
+        return rows
+
+    def load_results(self):
+        """
+        Rebuild the full results dictionary used by the report module
+        """
+        results = {'targets': self.targets}
+        for stage in STAGES:
+            results[stage] = {}
+        results['timestamp'] = self.timestamp
+        
+        for target, stages in self.segments.items():
+            for stage in stages:
+                results.setdefault(stage, {})[target] = self.read(target, stage)
+        
+        return results
@@ -0,0 +1,66 @@
+"""
+Run-wide deadline budget
+
+A single --max-runtime limit is shared out as work progresses: every
+target contributes weighted units for the stages it will run, and each
+stage gets the fraction of the remaining time that matches its share of
+the remaining units. Time a stage does not use flows to later ones.
+"""
+
+import time
+
+
+# Relative cost of each stage for one target
+STAGE_WEIGHTS = {
+    'subdomains': 3,
+    'live_hosts': 4,
+    'ports': 2,
+    'headers': 1
+}
+
+
+class RunBudget:
+    """
+    Split an overall deadline across targets and stages
+    """
+
+    def __init__(self, max_runtime, targets, stages):
+        self.deadline = time.monotonic() + max_runtime
+        self.remaining_work = sum(STAGE_WEIGHTS[stage] for stage in stages) * targets
+        self.truncated = {}
+
+    def remaining(self):
+        """Seconds left before the deadline"""
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self):
+        """True once the deadline has passed"""
+        return self.remaining() <= 0
+
+    def allot(self, stage, units=1, default=None):
+        """
+        Reserve time for a stage covering `units` targets
+        Returns timeout in seconds, capped at default if given
+        """
+        work = STAGE_WEIGHTS[stage] * units
+        share = self.remaining() * work / max(self.remaining_work, work)
+        self.remaining_work = max(0, self.remaining_work - work)
+        
+        if default is not None:
+            return min(default, share)
+        return share
+
+    def release(self, stages, units=1):
+        """
+        Return the work of stages that will not run to the pool
+        """
+        work = sum(STAGE_WEIGHTS[stage] for stage in stages) * units
+        self.remaining_work = max(0, self.remaining_work - work)
+
+    def mark_truncated(self, target, stage):
+        """
+        Record that a stage stopped early for a target
+        """
+        stages = self.truncated.setdefault(target, [])
+        if stage not in stages:
+            stages.append(stage)
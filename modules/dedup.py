@@ -0,0 +1,205 @@
+"""
+Run-wide deduplication of targets, subdomains and endpoints
+
+Overlapping work is done once and shared: child targets reuse their
+parent's enumeration, each subdomain is probed and port scanned once,
+endpoints that redirect to the same final URL share one header fetch,
+and results are looked up by host/URL for every target that owns them.
+"""
+
+from urllib.parse import urlparse, urljoin, urlunparse
+
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def collapse_targets(targets):
+    """
+    Split targets into roots and children whose parent domain is also a target
+    Returns (roots, children) where children maps child: nearest parent target
+    """
+    listed = {target.lower().rstrip('.') for target in targets}
+    roots = []
+    children = {}
+    
+    for target in targets:
+        labels = target.lower().rstrip('.').split('.')
+        parent = None
+        for i in range(1, len(labels) - 1):
+            candidate = '.'.join(labels[i:])
+            if candidate in listed:
+                parent = candidate
+                break
+        if parent:
+            children[target] = parent
+        else:
+            roots.append(target)
+    
+    # Resolve to the listed spelling of the nearest parent
+    spelled = {target.lower().rstrip('.'): target for target in targets}
+    children = {child: spelled[parent] for child, parent in children.items()}
+    
+    return roots, children
+
+
+def subdomains_under(parent_subdomains, child):
+    """
+    Select a child target's subdomains from its parent's enumeration
+    """
+    child = child.lower().rstrip('.')
+    suffix = '.' + child
+    selected = [sub for sub in parent_subdomains if sub.lower() == child or sub.lower().endswith(suffix)]
+    if child not in (sub.lower() for sub in selected):
+        selected.insert(0, child)
+    return selected
+
+
+def canonical_url(url):
+    """
+    Normalize a URL: lowercase scheme/host, drop default port and fragment
+    """
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or '').lower()
+    netloc = host
+    if parsed.port and parsed.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parsed.port}"
+    return urlunparse((scheme, netloc, parsed.path or '/', parsed.params, parsed.query, ''))
+
+
+def final_url(host_data):
+    """
+    Canonical URL an endpoint ends up at, following a redirect httpx reported
+    """
+    url = host_data['url']
+    location = host_data.get('location')
+    if location and 300 <= host_data.get('status_code', 0) < 400:
+        url = urljoin(url, location)
+    return canonical_url(url)
+
+
+def hostname_of(url):
+    """
+    Lowercase hostname of a URL
+    """
+    return (urlparse(url).hostname or '').lower()
+
+
+class RunDeduplicator:
+    """
+    Global seen-sets shared by every target in a run
+    """
+
+    def __init__(self):
+        self.owners = {}
+        self.endpoints = {}
+        self.endpoints_by_name = {}
+        self.ports = {}
+        self.port_scanned = set()
+        self.headers = {}
+
+    def claim_subdomains(self, target, subdomains):
+        """
+        Record target as an owner of its subdomains
+        Returns the subdomains no earlier target has claimed
+        """
+        new = []
+        for sub in subdomains:
+            key = sub.lower()
+            owners = self.owners.get(key)
+            if owners is None:
+                self.owners[key] = [target]
+                new.append(sub)
+            elif target not in owners:
+                owners.append(target)
+        return new
+
+    def add_live_hosts(self, live_hosts):
+        """
+        Store probe results, one record per probed URL
+        Returns the records that were not seen before
+        """
+        fresh = []
+        for host in live_hosts:
+            key = canonical_url(host['url'])
+            if key in self.endpoints:
+                continue
+            self.endpoints[key] = host
+            self.endpoints_by_name.setdefault(hostname_of(host['url']), []).append(key)
+            fresh.append(host)
+        return fresh
+
+    def live_hosts_for(self, subdomains):
+        """
+        Returns the live host records probed for a set of subdomains
+        """
+        hosts = []
+        for sub in dict.fromkeys(sub.lower() for sub in subdomains):
+            for key in self.endpoints_by_name.get(sub, []):
+                hosts.append(self.endpoints[key])
+        return hosts
+
+    def unscanned_hosts(self, live_hosts):
+        """
+        Returns live hosts whose hostname has not been port scanned yet
+        """
+        pending = []
+        names = set()
+        for host in live_hosts:
+            name = hostname_of(host['url'])
+            if name not in self.port_scanned and name not in names:
+                names.add(name)
+                pending.append(host)
+        return pending
+
+    def add_ports(self, scanned_hosts, port_results):
+        """
+        Mark hosts as scanned and store their open ports
+        """
+        for host in scanned_hosts:
+            self.port_scanned.add(hostname_of(host['url']))
+        self.ports.update(port_results)
+
+    def ports_for(self, live_hosts):
+        """
+        Returns dictionary of host: ports for the given live hosts
+        """
+        results = {}
+        for host in live_hosts:
+            name = hostname_of(host['url'])
+            if name in self.ports:
+                results[name] = self.ports[name]
+        return results
+
+    def unchecked_hosts(self, live_hosts):
+        """
+        Returns live hosts whose final URL has no header result yet
+        Hosts redirecting to the same page (a shared SSO login, say) are fetched once
+        """
+        pending = []
+        finals = set()
+        for host in live_hosts:
+            key = final_url(host)
+            if key not in self.headers and key not in finals:
+                finals.add(key)
+                pending.append(host)
+        return pending
+
+    def add_headers(self, checked_hosts, header_results):
+        """
+        Store header results by the final URL of each checked host
+        """
+        for host in checked_hosts:
+            if host['url'] in header_results:
+                self.headers[final_url(host)] = header_results[host['url']]
+
+    def headers_for(self, live_hosts):
+        """
+        Returns dictionary of URL: header analysis for the given live hosts
+        """
+        results = {}
+        for host in live_hosts:
+            key = final_url(host)
+            if key in self.headers:
+                results[host['url']] = self.headers[key]
+        return results
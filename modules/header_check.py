@@ -4,6 +4,7 @@ Security headers checker
 
 import requests
 import json
+import time
 from pathlib import Path
 from urllib3.exceptions import InsecureRequestWarning
 
@@ -22,10 +23,20 @@ SECURITY_HEADERS = {
     'Permissions-Policy': 'Permissions-Policy'
 }
 
+# Bodies up to this size are read and discarded so the connection can be reused
+MAX_DRAIN = 64 * 1024
 
-def check_security_headers(live_hosts, output_dir, silent=False):
+
+def check_security_headers(live_hosts, output_dir, silent=False, save=True, on_result=None,
+                           timeout=None, on_truncated=None, cache=None, session=None):
     """
     Check security headers for each live host
+    on_result, if given, is called with (url, analysis) after each URL
+    timeout, if given, caps the whole stage; URLs not reached in time
+    are skipped and on_truncated (if given) is called
+    cache, if given, is an HttpCache used for conditional requests;
+    the caller saves it once the run is done
+    session, if given, is a requests.Session whose connections are reused
     Returns dictionary of URL: header analysis
     """
     if not live_hosts:
@@ -37,21 +48,54 @@ def check_security_headers(live_hosts, output_dir, silent=False):
     if not silent:
         print(f"    Checking {len(live_hosts)} hosts...")
     
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    truncated = False
+    http = session or requests
+    
     for host_data in live_hosts:
         url = host_data['url']
         
+        request_timeout = 10
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if not silent:
+                    print(f"    Time budget exhausted, skipping remaining hosts")
+                truncated = True
+                break
+            request_timeout = min(request_timeout, remaining)
+        
         try:
             if not silent:
                 print(f"    Checking: {url}")
             
-            # Make request
-            response = requests.get(
-                url,
-                timeout=10,
+            request_url, conditional, cached = url, {}, None
+            if cache:
+                request_url, conditional, cached = cache.request_plan(url)
+            replayed = cached is not None and request_url != url
+            
+            # Make request; only headers are analyzed, so the body is never kept
+            response = http.get(
+                request_url,
+                timeout=request_timeout,
                 verify=False,  # Skip SSL verification for testing
                 allow_redirects=True,
-                headers={'User-Agent': 'ReconX Security Scanner'}
+                stream=True,
+                headers={'User-Agent': 'ReconX Security Scanner', **conditional}
             )
+            release_connection(response)
+            
+            if cached and response.status_code == 304:
+                # Unchanged since the last run: reuse the cached analysis
+                cache.revalidated(url, replayed)
+                results[url] = dict(cached['analysis'])
+                
+                if not silent:
+                    print(f"      Security Score: {results[url]['security_score']}/7 (not modified)")
+                
+                if on_result:
+                    on_result(url, results[url])
+                continue
             
             # Analyze headers
             analysis = analyze_headers(response.headers)
@@ -64,23 +108,34 @@ def check_security_headers(live_hosts, output_dir, silent=False):
                 'recommendations': analysis['recommendations']
             }
             
+            if cache:
+                cache.store(url, response, results[url], cached['redirects'] if replayed else None)
+            
             if not silent:
                 print(f"      Security Score: {analysis['score']}/7")
             
+            if on_result:
+                on_result(url, results[url])
+            
         except requests.exceptions.RequestException as e:
             if not silent:
                 print(f"      Error: {str(e)}")
             results[url] = {
                 'error': str(e)
             }
+            if on_result:
+                on_result(url, results[url])
             continue
         except Exception as e:
             if not silent:
                 print(f"      Unexpected error: {str(e)}")
             continue
     
+    if truncated and on_truncated:
+        on_truncated()
+    
     # Save results
-    if results:
+    if results and save:
         with open(output_file, 'w') as f:
             json.dump(results, f, indent=2)
         
@@ -90,6 +145,25 @@ def check_security_headers(live_hosts, output_dir, silent=False):
     return results
 
 
+def release_connection(response):
+    """
+    Close a streamed response, returning its connection to the session's pool
+    Small bodies are drained first; larger ones drop the connection instead
+    """
+    length = response.headers.get('Content-Length', '')
+    if not length.isdigit() or int(length) <= MAX_DRAIN:
+        drained = 0
+        try:
+            for chunk in response.iter_content(8192):
+                drained += len(chunk)
+                if drained > MAX_DRAIN:
+                    break
+        except requests.exceptions.RequestException:
+            # The headers are already analyzed; just drop the connection
+            pass
+    response.close()
+
+
 def analyze_headers(headers):
     """
     Analyze response headers for security
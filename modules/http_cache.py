@@ -0,0 +1,130 @@
+"""
+On-disk HTTP response-metadata cache for header checks
+
+For each URL the cache keeps the validators (ETag / Last-Modified), the
+redirect chain, the final response headers and the header analysis.
+Later runs send conditional requests and reuse the analysis on a 304;
+within the TTL the redirect chain is replayed from cache by requesting
+the final URL directly. The least recently used entries are evicted once
+the cache holds more than max_entries URLs.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+class HttpCache:
+    """
+    URL-keyed cache of response metadata, persisted as a JSON file
+    """
+
+    def __init__(self, path, ttl=86400, max_entries=10000):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        
+        try:
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"[!] Ignoring unreadable HTTP cache {self.path}: {str(e)}")
+
+    def get(self, url):
+        """
+        Returns the cached entry for a URL, or None
+        """
+        with self._lock:
+            entry = self.entries.get(url)
+            if entry:
+                entry['used_at'] = time.time()
+            return entry
+
+    def fresh(self, entry):
+        """
+        True if the entry's redirect chain may be replayed without re-following it
+        """
+        return time.time() - entry['fetched_at'] < self.ttl
+
+    def request_plan(self, url):
+        """
+        Decide how to fetch a URL
+        Returns (request_url, conditional_headers, entry)
+        """
+        entry = self.get(url)
+        if not entry:
+            return url, {}, None
+        
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        
+        request_url = entry['final_url'] if self.fresh(entry) else url
+        return request_url, headers, entry
+
+    def store(self, url, response, analysis, replayed_chain=None):
+        """
+        Cache the metadata of a full (non-304) response
+        replayed_chain is the cached redirect chain that led to the request URL
+        """
+        chain = list(replayed_chain or [])
+        chain.extend([hop.url, hop.status_code] for hop in response.history)
+        
+        now = time.time()
+        with self._lock:
+            self.entries[url] = {
+                'final_url': response.url,
+                'redirects': chain,
+                'status_code': response.status_code,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'headers': dict(response.headers),
+                'analysis': analysis,
+                'fetched_at': now,
+                'used_at': now
+            }
+            self._dirty = True
+
+    def revalidated(self, url, replayed):
+        """
+        Mark an entry as confirmed unchanged by a 304
+        Re-following the redirect chain restarts its TTL
+        """
+        with self._lock:
+            entry = self.entries.get(url)
+            if entry and not replayed:
+                entry['fetched_at'] = time.time()
+            self._dirty = True
+
+    def save(self):
+        """
+        Evict least recently used entries beyond max_entries and write the cache
+        Does nothing if no response was stored or revalidated since the last save
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            
+            if len(self.entries) > self.max_entries:
+                keep = sorted(self.entries, key=lambda u: self.entries[u]['used_at'], reverse=True)
+                self.entries = {url: self.entries[url] for url in keep[:self.max_entries]}
+            data = json.dumps(self.entries, separators=(',', ':'))
+            
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                temp_file = self.path.with_name(self.path.name + '.tmp')
+                with open(temp_file, 'w') as f:
+                    f.write(data)
+                os.replace(temp_file, self.path)
+            except OSError as e:
+                print(f"[!] Error saving HTTP cache {self.path}: {str(e)}")
@@ -2,22 +2,62 @@
 HTTP probing using httpx
 """
 
-import subprocess
 import json
+import time
 from pathlib import Path
+from urllib.parse import urlparse
+from modules.utils import run_command
 
 
-def probe_http(subdomains, output_dir, threads=50, silent=False):
+def probe_http(subdomains, output_dir, threads=50, silent=False, save=True, on_result=None,
+               timeout=600, on_truncated=None):
     """
     Probe live HTTP/HTTPS hosts using httpx
+    on_result, if given, is called with each host as httpx reports it
+    If httpx runs out of time, hosts found so far are kept and
+    on_truncated (if given) is called
     Returns list of live URLs with metadata
     """
     if not subdomains:
         return []
     
+    try:
+        callback = (lambda source, host: on_result(host)) if on_result else None
+        results, timed_out = run_httpx(subdomains, output_dir, threads, silent, timeout, on_result=callback)
+        live_hosts = [host for _, host in results]
+        
+        if timed_out:
+            if not silent:
+                print(f"[!] HTTPx timeout, keeping {len(live_hosts)} partial results")
+            if on_truncated:
+                on_truncated()
+        
+        # Save results
+        if save:
+            save_live_hosts(live_hosts, output_dir)
+        
+        return live_hosts
+        
+    except FileNotFoundError:
+        print("[!] HTTPx not found. Install with: go install -v github.com/projectdiscovery/httpx/cmd/httpx@latest")
+        return []
+    except Exception as e:
+        if not silent:
+            print(f"[!] Error in HTTP probing: {str(e)}")
+        return []
+
+
+def run_httpx(subdomains, output_dir, threads=50, silent=False, timeout=600, on_result=None):
+    """
+    Run a single httpx invocation over a list of subdomains
+    Output is consumed line by line; on_result(input, host_data) is
+    called for each result as soon as httpx prints it
+    Returns (results, timed_out) where results is a list of
+    (input, host_data) tuples and input is the subdomain httpx was
+    given for that result
+    """
     # Create temp file for subdomains
     temp_input = Path(output_dir) / "temp_subdomains.txt"
-    output_file = Path(output_dir) / "live_hosts.json"
     
     try:
         # Write subdomains to temp file
@@ -37,63 +77,194 @@ def probe_http(subdomains, output_dir, threads=50, silent=False):
             '-status-code',
             '-title',
             '-tech-detect',
+            '-location',
             '-threads', str(threads),
             '-timeout', '10',
             '-retries', '2'
         ]
         
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=600  # 10 minutes timeout
-        )
-        
-        live_hosts = []
-        
-        if result.stdout:
-            # Parse JSON lines
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    try:
-                        data = json.loads(line)
-                        live_hosts.append({
-                            'url': data.get('url', ''),
-                            'status_code': data.get('status_code', 0),
-                            'title': data.get('title', ''),
-                            'tech': data.get('tech', []),
-                            'content_length': data.get('content_length', 0),
-                            'host': data.get('host', '')
-                        })
-                    except json.JSONDecodeError:
-                        continue
+        results = []
         
-        # Save results
-        if live_hosts:
-            with open(output_file, 'w') as f:
-                json.dump(live_hosts, f, indent=2)
-            
-            # Also save simple list
-            simple_list = Path(output_dir) / "live_hosts.txt"
-            with open(simple_list, 'w') as f:
-                for host in live_hosts:
-                    f.write(f"{host['url']}\n")
+        def collect(line):
+            parsed = parse_httpx_line(line)
+            if parsed is None:
+                return
+            results.append(parsed)
+            if on_result:
+                on_result(*parsed)
+        
+        result = run_command(cmd, timeout=timeout, on_line=collect)
+        
+        return results, result.timed_out
         
+    finally:
         # Cleanup temp file
         temp_input.unlink(missing_ok=True)
+
+
+def parse_httpx_line(line):
+    """
+    Parse a single httpx JSON output line
+    Returns (input, host_data) tuple, or None if the line is not a result
+    """
+    line = line.strip()
+    if not line:
+        return None
+    
+    try:
+        data = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    
+    host = {
+        'url': data.get('url', ''),
+        'status_code': data.get('status_code', 0),
+        'title': data.get('title', ''),
+        'tech': data.get('tech', []),
+        'content_length': data.get('content_length', 0),
+        'host': data.get('host', ''),
+        'location': data.get('location', '')
+    }
+    
+    # Older httpx releases do not echo the input line back
+    source = data.get('input') or urlparse(host['url']).hostname or ''
+    return source.lower(), host
+
+
+def save_live_hosts(live_hosts, output_dir, name="live_hosts"):
+    """
+    Save live hosts as JSON and as a simple URL list
+    """
+    if not live_hosts:
+        return
+    
+    output_file = Path(output_dir) / f"{name}.json"
+    with open(output_file, 'w') as f:
+        json.dump(live_hosts, f, indent=2)
+    
+    # Also save simple list
+    simple_list = Path(output_dir) / f"{name}.txt"
+    with open(simple_list, 'w') as f:
+        for host in live_hosts:
+            f.write(f"{host['url']}\n")
+
+
+class HttpxBatcher:
+    """
+    Probe subdomains from many targets with a few large httpx runs
+    
+    Subdomains are queued per target and flushed into a single httpx
+    invocation once batch_size names are pending or flush_interval
+    seconds have passed since the oldest queued name. Every live host
+    is attributed back to each target that queued its subdomain.
+    If order is given, it sorts the pending names before each flush.
+    """
+
+    def __init__(self, output_dir, threads=50, silent=False, batch_size=5000, flush_interval=300,
+                 save=True, on_result=None, budget=None, on_truncated=None, order=None):
+        self.output_dir = output_dir
+        self.threads = threads
+        self.silent = silent
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.save = save
+        self.on_result = on_result
+        self.budget = budget
+        self.on_truncated = on_truncated
+        self.order = order
+        self.results = {}
+        self._pending = {}
+        self._queued_at = None
+
+    def add(self, target, subdomains):
+        """
+        Queue subdomains for a target, flushing if the batch is due
+        """
+        self.results.setdefault(target, [])
         
-        return live_hosts
+        for sub in subdomains:
+            owners = self._pending.setdefault(sub.lower(), [])
+            if target not in owners:
+                owners.append(target)
         
-    except subprocess.TimeoutExpired:
-        if not silent:
-            print(f"[!] HTTPx timeout")
-        temp_input.unlink(missing_ok=True)
-        return []
-    except FileNotFoundError:
-        print("[!] HTTPx not found. Install with: go install -v github.com/projectdiscovery/httpx/cmd/httpx@latest")
-        return []
-    except Exception as e:
-        if not silent:
-            print(f"[!] Error in HTTP probing: {str(e)}")
-        temp_input.unlink(missing_ok=True)
-        return []
\ No newline at end of file
+        if self._pending and self._queued_at is None:
+            self._queued_at = time.monotonic()
+        
+        if self._due():
+            self.flush()
+
+    def _due(self):
+        if len(self._pending) >= self.batch_size:
+            return True
+        if self._queued_at is None:
+            return False
+        return time.monotonic() - self._queued_at >= self.flush_interval
+
+    def flush(self):
+        """
+        Probe everything queued so far
+        """
+        pending = list(self._pending.items())
+        if self.order:
+            # Highest-value names across all targets go into the first batch
+            owners = self._pending
+            pending = [(sub, owners[sub]) for sub in self.order(list(owners))]
+        self._pending = {}
+        self._queued_at = None
+        
+        for start in range(0, len(pending), self.batch_size):
+            chunk = dict(pending[start:start + self.batch_size])
+            
+            targets = {target for owners in chunk.values() for target in owners}
+            
+            if not self.silent:
+                print(f"    Batch probing {len(chunk)} subdomains across {len(targets)} target(s)")
+            
+            def attribute(source, host):
+                for target in chunk.get(source, []):
+                    self.results[target].append(host)
+                    if self.on_result:
+                        self.on_result(target, host)
+            
+            timeout = 600
+            if self.budget:
+                timeout = self.budget.allot('live_hosts', units=len(targets), default=timeout)
+            
+            try:
+                _, timed_out = run_httpx(list(chunk), self.output_dir, self.threads, self.silent, timeout,
+                                         on_result=attribute)
+            except FileNotFoundError:
+                print("[!] HTTPx not found. Install with: go install -v github.com/projectdiscovery/httpx/cmd/httpx@latest")
+                return
+            except Exception as e:
+                if not self.silent:
+                    print(f"[!] Error in HTTP probing: {str(e)}")
+                continue
+            
+            if timed_out:
+                if not self.silent:
+                    print(f"[!] HTTPx timeout, keeping partial results")
+                if self.on_truncated:
+                    for target in targets:
+                        self.on_truncated(target)
+
+    def close(self):
+        """
+        Flush remaining subdomains and save results
+        Returns dictionary of target: live hosts
+        """
+        self.flush()
+        
+        if not self.save:
+            return self.results
+        
+        all_hosts = []
+        seen = set()
+        for hosts in self.results.values():
+            for host in hosts:
+                if host['url'] not in seen:
+                    seen.add(host['url'])
+                    all_hosts.append(host)
+        save_live_hosts(all_hosts, self.output_dir)
+        
+        return self.results
@@ -2,15 +2,21 @@
 Port scanning using nmap
 """
 
-import subprocess
 import json
+import time
 from pathlib import Path
 from urllib.parse import urlparse
+from modules.utils import run_command
 
 
-def scan_ports(live_hosts, output_dir, silent=False):
+def scan_ports(live_hosts, output_dir, silent=False, save=True, on_result=None, host_filter=None,
+               timeout=None, on_truncated=None):
     """
     Scan top ports on live hosts using nmap
+    on_result, if given, is called with (host, open_ports) after each host
+    host_filter, if given, drops hosts for which it returns False
+    timeout, if given, caps the whole stage; when it runs out the ports
+    found so far are kept and on_truncated (if given) is called
     Returns dictionary of host: ports
     """
     if not live_hosts:
@@ -19,13 +25,16 @@ def scan_ports(live_hosts, output_dir, silent=False):
     output_file = Path(output_dir) / "ports.json"
     port_results = {}
     
-    # Extract unique hosts
-    hosts = set()
+    # Extract unique hosts, keeping the order they were given in
+    hosts = {}
     for host_data in live_hosts:
         parsed = urlparse(host_data['url'])
         hostname = parsed.hostname or parsed.netloc
         if hostname:
-            hosts.add(hostname)
+            hosts[hostname] = True
+    
+    if host_filter:
+        hosts = [host for host in hosts if host_filter(host)]
     
     if not hosts:
         return {}
@@ -33,7 +42,20 @@ def scan_ports(live_hosts, output_dir, silent=False):
     if not silent:
         print(f"    Scanning {len(hosts)} unique hosts...")
     
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    truncated = False
+    
     for host in hosts:
+        host_timeout = 300  # 5 minutes per host
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if not silent:
+                    print(f"    Time budget exhausted, skipping remaining hosts")
+                truncated = True
+                break
+            host_timeout = min(host_timeout, remaining)
+        
         try:
             if not silent:
                 print(f"    Scanning: {host}")
@@ -49,32 +71,33 @@ def scan_ports(live_hosts, output_dir, silent=False):
                 host
             ]
             
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minutes per host
-            )
+            result = run_command(cmd, timeout=host_timeout)
+            
+            if result.timed_out:
+                truncated = True
+                if not silent:
+                    print(f"      Timeout scanning {host}, keeping partial results")
             
-            if result.returncode == 0 and result.stdout:
+            if (result.returncode == 0 or result.timed_out) and result.stdout:
                 # Parse nmap XML output (basic parsing)
                 open_ports = parse_nmap_xml(result.stdout)
                 if open_ports:
                     port_results[host] = open_ports
+                    if on_result:
+                        on_result(host, open_ports)
                     if not silent:
                         print(f"      Found {len(open_ports)} open ports")
             
-        except subprocess.TimeoutExpired:
-            if not silent:
-                print(f"      Timeout scanning {host}")
-            continue
         except Exception as e:
             if not silent:
                 print(f"      Error scanning {host}: {str(e)}")
             continue
     
+    if truncated and on_truncated:
+        on_truncated()
+    
     # Save results
-    if port_results:
+    if port_results and save:
         with open(output_file, 'w') as f:
             json.dump(port_results, f, indent=2)
     
@@ -0,0 +1,264 @@
+"""
+Priority ordering of subdomains and live hosts
+
+Names are scored by keyword weights, label depth and prior-run history,
+then fed to probing, port scanning and header checks highest score
+first, so time-boxed or rate-limited runs reach high-value hosts early.
+"""
+
+import heapq
+import itertools
+import json
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlparse
+
+
+# Serializes history updates from concurrent runs (daemon mode)
+_history_lock = threading.Lock()
+
+# Keywords that usually mark high-value hosts (see README: Reading the Output)
+DEFAULT_KEYWORDS = {
+    'admin': 10,
+    'jenkins': 10,
+    'vpn': 9,
+    'internal': 8,
+    'api': 8,
+    'graphql': 8,
+    'git': 8,
+    'grafana': 8,
+    'kibana': 8,
+    'dev': 7,
+    'staging': 7,
+    'backup': 7,
+    'uat': 6,
+    'sso': 6,
+    'auth': 6,
+    'login': 6,
+    'legacy': 6,
+    'test': 5,
+    'qa': 5,
+    'beta': 5,
+    'old': 5,
+    'portal': 5,
+    'rest': 4
+}
+
+# Hostname scores a Prioritizer remembers; least recently used go first
+SCORE_CACHE_SIZE = 100000
+
+# Second-level labels that act as public suffixes under country TLDs (example.co.uk)
+COUNTRY_SLDS = {'ac', 'co', 'com', 'edu', 'gov', 'ltd', 'ne', 'net', 'or', 'org', 'plc'}
+
+# Separators between keyword tokens inside a subdomain (dev-api.eu.example.com)
+TOKEN_SEPARATORS = re.compile(r'[.\-_]+')
+
+
+class PriorityQueue:
+    """
+    Max-priority queue; items with equal priority keep insertion order
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, item, priority):
+        """Add an item with the given priority"""
+        heapq.heappush(self._heap, (-priority, next(self._counter), item))
+
+    def pop(self):
+        """Remove and return the highest-priority item"""
+        return heapq.heappop(self._heap)[2]
+
+    def drain(self):
+        """Yield every item, highest priority first"""
+        while self._heap:
+            yield self.pop()
+
+
+class Prioritizer:
+    """
+    Score hostnames and order work by score
+    """
+
+    def __init__(self, keywords=None, depth_weight=1, live_weight=5, new_weight=2, history=None):
+        keywords = DEFAULT_KEYWORDS if keywords is None else keywords
+        self.keywords = {keyword.lower(): weight for keyword, weight in keywords.items()}
+        self.depth_weight = depth_weight
+        self.live_weight = live_weight
+        self.new_weight = new_weight
+        history = history or {}
+        self.previously_live = set(history.get('live', []))
+        self.previously_seen = set(history.get('seen', []))
+        self._scores = OrderedDict()
+        self._scores_lock = threading.Lock()
+        self._history_version = 0
+
+    def score(self, name):
+        """
+        Score a hostname; higher means probe sooner
+        """
+        name = name.lower()
+        with self._scores_lock:
+            score = self._scores.get(name)
+            if score is not None:
+                self._scores.move_to_end(name)
+                return score
+            version = self._history_version
+        
+        labels = name.split('.')
+        # Keywords only count in the subdomain part, not the registered domain
+        subdomain_labels = labels[:-registered_length(labels)]
+        
+        # Whole tokens only, so "digital" is not "git"; trailing digits are a counter (admin2)
+        tokens = {token.rstrip('0123456789') for token in TOKEN_SEPARATORS.split('.'.join(subdomain_labels))}
+        
+        score = sum(self.keywords.get(token, 0) for token in tokens if token)
+        score += self.depth_weight * min(len(subdomain_labels), 4)
+        
+        if name in self.previously_live:
+            score += self.live_weight
+        elif self.previously_seen and name not in self.previously_seen:
+            score += self.new_weight
+        
+        with self._scores_lock:
+            # Not cached if add_history() changed the history while scoring
+            if version == self._history_version:
+                self._scores[name] = score
+            while len(self._scores) > SCORE_CACHE_SIZE:
+                self._scores.popitem(last=False)
+        return score
+
+    def add_history(self, results):
+        """
+        Fold a finished run's subdomains and live hosts into the scoring history
+        Only the scores of names whose history changed are recomputed
+        """
+        seen, live = history_names(results)
+        
+        with self._scores_lock:
+            changed = (seen - self.previously_seen) | (live - self.previously_live)
+            # The first recorded run turns on the new-name boost for every other name
+            boost_starts = bool(seen) and not self.previously_seen
+            self._history_version += 1
+            self.previously_seen.update(seen)
+            self.previously_live.update(live)
+            if boost_starts:
+                self._scores.clear()
+            else:
+                for name in changed:
+                    self._scores.pop(name, None)
+
+    def order(self, names):
+        """
+        Returns names sorted by priority through a priority queue
+        """
+        queue = PriorityQueue()
+        for name in names:
+            queue.push(name, self.score(name))
+        return list(queue.drain())
+
+    def order_hosts(self, live_hosts):
+        """
+        Returns live host records sorted by the priority of their hostname
+        """
+        queue = PriorityQueue()
+        for host in live_hosts:
+            queue.push(host, self.score(urlparse(host['url']).hostname or ''))
+        return list(queue.drain())
+
+
+def registered_length(labels):
+    """
+    Number of trailing labels forming the registered domain
+    Returns 3 for names under a country second-level suffix (co.uk), else 2
+    """
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in COUNTRY_SLDS:
+        return 3
+    return 2
+
+
+def load_prioritizer(config_path=None, history_path=None):
+    """
+    Build a Prioritizer from an optional JSON config and history file
+    Config keys: keywords (name: weight), depth_weight, live_weight, new_weight
+    """
+    config = {}
+    if config_path:
+        try:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"[!] Error reading priority config {config_path}: {str(e)}")
+    
+    return Prioritizer(
+        keywords=config.get('keywords'),
+        depth_weight=config.get('depth_weight', 1),
+        live_weight=config.get('live_weight', 5),
+        new_weight=config.get('new_weight', 2),
+        history=load_history(history_path) if history_path else None
+    )
+
+
+def load_history(history_path):
+    """
+    Load prior-run history
+    Returns dictionary with 'live' and 'seen' hostname lists
+    """
+    try:
+        with open(history_path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"[!] Error reading history {history_path}: {str(e)}")
+        return {}
+
+
+def save_history(history_path, results):
+    """
+    Merge this run's subdomains and live hosts into the history file
+    """
+    with _history_lock:
+        _merge_history(history_path, results)
+
+
+def history_names(results):
+    """
+    Returns (seen, live) sets of hostnames recorded by a run
+    """
+    seen = set()
+    live = set()
+    for subdomains in results['subdomains'].values():
+        seen.update(sub.lower() for sub in subdomains)
+    for live_hosts in results['live_hosts'].values():
+        for host in live_hosts:
+            hostname = urlparse(host['url']).hostname
+            if hostname:
+                live.add(hostname.lower())
+    return seen, live
+
+
+def _merge_history(history_path, results):
+    history = load_history(history_path)
+    seen, live = history_names(results)
+    seen.update(history.get('seen', []))
+    live.update(history.get('live', []))
+    
+    try:
+        Path(history_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(history_path, 'w') as f:
+            json.dump({
+                'updated': datetime.now().isoformat(timespec='seconds'),
+                'seen': sorted(seen),
+                'live': sorted(live)
+            }, f)
+    except OSError as e:
+        print(f"[!] Error saving history {history_path}: {str(e)}")
@@ -1,157 +1,341 @@
 """
 Report generation module
+
+All requested formats are built from one shared, pre-indexed view of the
+results. With several formats they are rendered in parallel workers
+(forked processes where available, so the view is shared rather than
+copied), and every writer batches its output into large writes.
 """
 
 import json
 import csv
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from json.encoder import encode_basestring_ascii
 from pathlib import Path
 from datetime import datetime
 
 
-def generate_report(results, output_dir, format_type, timestamp):
+# Size of the write buffer used by every report writer
+WRITE_BUFFER = 1 << 20
+
+# View handed to forked workers; set just before the pool starts
+_SHARED_VIEW = None
+
+
+class ReportView:
+    """
+    Read-only index over a results dictionary, with totals computed once
+    """
+
+    def __init__(self, results):
+        self.results = results
+        self.targets = results['targets']
+        self.subdomains = results['subdomains']
+        self.live_hosts = results['live_hosts']
+        self.ports = results['ports']
+        self.headers = results['headers']
+        self.truncated = results.get('truncated') or {}
+        
+        self.total_subdomains = sum(map(len, self.subdomains.values()))
+        self.total_live = sum(map(len, self.live_hosts.values()))
+        self.total_port_hosts = sum(map(len, self.ports.values()))
+        self.total_header_hosts = sum(map(len, self.headers.values()))
+
+
+def generate_report(results, output_dir, format_type, timestamp, workers=None):
     """
     Generate final report in specified format(s)
+    workers caps the number of formats rendered at once (default: one per CPU)
     Returns list of generated file paths
     """
-    output_files = []
-    
     if format_type == 'all':
         formats = ['txt', 'json', 'csv']
     else:
         formats = [format_type]
     
-    for fmt in formats:
-        if fmt == 'txt':
-            output_files.append(generate_txt_report(results, output_dir, timestamp))
-        elif fmt == 'json':
-            output_files.append(generate_json_report(results, output_dir, timestamp))
-        elif fmt == 'csv':
-            output_files.append(generate_csv_report(results, output_dir, timestamp))
+    view = ReportView(results)
     
-    return output_files
+    if workers is None:
+        workers = min(len(formats), os.cpu_count() or 1)
+    
+    if workers <= 1 or len(formats) == 1:
+        return [_render(fmt, view, output_dir, timestamp) for fmt in formats]
+    
+    return _render_parallel(formats, view, output_dir, timestamp, workers)
+
 
+def _render(fmt, view, output_dir, timestamp):
+    if fmt == 'txt':
+        return generate_txt_report(view.results, output_dir, timestamp, view)
+    elif fmt == 'json':
+        return generate_json_report(view.results, output_dir, timestamp, view)
+    elif fmt == 'csv':
+        return generate_csv_report(view.results, output_dir, timestamp, view)
 
-def generate_txt_report(results, output_dir, timestamp):
+
+def _render_shared(fmt, output_dir, timestamp):
+    return _render(fmt, _SHARED_VIEW, output_dir, timestamp)
+
+
+def _render_parallel(formats, view, output_dir, timestamp, workers):
+    """
+    Render formats concurrently and return their paths in request order
+    """
+    global _SHARED_VIEW
+    
+    # Forked workers inherit the view instead of receiving a pickled copy
+    if 'fork' in multiprocessing.get_all_start_methods():
+        _SHARED_VIEW = view
+        try:
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = [pool.submit(_render_shared, fmt, output_dir, timestamp) for fmt in formats]
+                return [future.result() for future in futures]
+        finally:
+            _SHARED_VIEW = None
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_render, fmt, view, output_dir, timestamp) for fmt in formats]
+        return [future.result() for future in futures]
+
+
+def generate_txt_report(results, output_dir, timestamp, view=None):
     """
     Generate human-readable text report
     """
+    view = view or ReportView(results)
     report_file = Path(output_dir) / f"report_{timestamp}.txt"
+    rule = "=" * 80 + "\n"
+    dash = "-" * 80 + "\n"
     
-    with open(report_file, 'w') as f:
-        f.write("=" * 80 + "\n")
-        f.write("RECONX RECONNAISSANCE REPORT\n")
-        f.write("=" * 80 + "\n")
-        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Targets: {', '.join(results['targets'])}\n")
-        f.write("=" * 80 + "\n\n")
-        
-        # Summary
-        f.write("SUMMARY\n")
-        f.write("-" * 80 + "\n")
+    with open(report_file, 'w', buffering=WRITE_BUFFER) as f:
+        out = [
+            rule,
+            "RECONX RECONNAISSANCE REPORT\n",
+            rule,
+            f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+            f"Targets: {', '.join(view.targets)}\n",
+            rule + "\n",
+            # Summary
+            "SUMMARY\n",
+            dash,
+            f"Total Subdomains Discovered: {view.total_subdomains}\n",
+            f"Total Live Hosts: {view.total_live}\n"
+        ]
         
-        total_subdomains = sum(len(subs) for subs in results['subdomains'].values())
-        total_live = sum(len(hosts) for hosts in results['live_hosts'].values())
+        if view.ports:
+            out.append(f"Hosts with Open Ports: {view.total_port_hosts}\n")
         
-        f.write(f"Total Subdomains Discovered: {total_subdomains}\n")
-        f.write(f"Total Live Hosts: {total_live}\n")
+        if view.headers:
+            out.append(f"Hosts Checked for Security Headers: {view.total_header_hosts}\n")
         
-        if results['ports']:
-            total_hosts_scanned = sum(len(ports) for ports in results['ports'].values())
-            f.write(f"Hosts with Open Ports: {total_hosts_scanned}\n")
+        if view.truncated:
+            out.append(f"Targets Cut Short by --max-runtime: {len(view.truncated)} (results are partial)\n")
         
-        if results['headers']:
-            total_checked = sum(len(headers) for headers in results['headers'].values())
-            f.write(f"Hosts Checked for Security Headers: {total_checked}\n")
+        out.append("\n" + rule + "\n")
+        f.write(''.join(out))
         
-        f.write("\n" + "=" * 80 + "\n\n")
-        
-        # Detailed results per target
-        for target in results['targets']:
-            f.write(f"\nTARGET: {target}\n")
-            f.write("=" * 80 + "\n\n")
+        # Detailed results per target, one write per target
+        for target in view.targets:
+            out = [f"\nTARGET: {target}\n", rule, "\n"]
+            
+            if target in view.truncated:
+                out.append(f"[!] Truncated stages: {', '.join(view.truncated[target])}\n\n")
             
             # Subdomains
-            if target in results['subdomains']:
-                subdomains = results['subdomains'][target]
-                f.write(f"[+] Subdomains ({len(subdomains)})\n")
-                f.write("-" * 80 + "\n")
-                for sub in subdomains[:20]:  # Show first 20
-                    f.write(f"  - {sub}\n")
+            if target in view.subdomains:
+                subdomains = view.subdomains[target]
+                out.append(f"[+] Subdomains ({len(subdomains)})\n")
+                out.append(dash)
+                out.extend(f"  - {sub}\n" for sub in subdomains[:20])  # Show first 20
                 if len(subdomains) > 20:
-                    f.write(f"  ... and {len(subdomains) - 20} more\n")
-                f.write("\n")
+                    out.append(f"  ... and {len(subdomains) - 20} more\n")
+                out.append("\n")
             
             # Live hosts
-            if target in results['live_hosts']:
-                live_hosts = results['live_hosts'][target]
-                f.write(f"[+] Live Hosts ({len(live_hosts)})\n")
-                f.write("-" * 80 + "\n")
+            if target in view.live_hosts:
+                live_hosts = view.live_hosts[target]
+                out.append(f"[+] Live Hosts ({len(live_hosts)})\n")
+                out.append(dash)
                 for host in live_hosts:
-                    f.write(f"  - {host['url']} [{host['status_code']}]")
-                    if host.get('title'):
-                        f.write(f" - {host['title'][:50]}")
-                    f.write("\n")
-                f.write("\n")
+                    title = host.get('title')
+                    if title:
+                        out.append(f"  - {host['url']} [{host['status_code']}] - {title[:50]}\n")
+                    else:
+                        out.append(f"  - {host['url']} [{host['status_code']}]\n")
+                out.append("\n")
             
             # Port scan results
-            if target in results['ports'] and results['ports'][target]:
-                f.write(f"[+] Port Scan Results\n")
-                f.write("-" * 80 + "\n")
-                for host, ports in results['ports'][target].items():
-                    f.write(f"  {host}:\n")
-                    for port in ports:
-                        f.write(f"    - {port['port']}/{port['protocol']} ({port['service']})\n")
-                f.write("\n")
+            if view.ports.get(target):
+                out.append(f"[+] Port Scan Results\n")
+                out.append(dash)
+                for host, ports in view.ports[target].items():
+                    out.append(f"  {host}:\n")
+                    out.extend(f"    - {port['port']}/{port['protocol']} ({port['service']})\n" for port in ports)
+                out.append("\n")
             
             # Security headers
-            if target in results['headers'] and results['headers'][target]:
-                f.write(f"[+] Security Headers Analysis\n")
-                f.write("-" * 80 + "\n")
-                for url, data in results['headers'][target].items():
+            if view.headers.get(target):
+                out.append(f"[+] Security Headers Analysis\n")
+                out.append(dash)
+                for url, data in view.headers[target].items():
                     if 'error' not in data:
-                        f.write(f"  {url}\n")
-                        f.write(f"    Score: {data['security_score']}/7\n")
+                        out.append(f"  {url}\n")
+                        out.append(f"    Score: {data['security_score']}/7\n")
                         if data['headers_missing']:
-                            f.write(f"    Missing: {', '.join(data['headers_missing'])}\n")
-                f.write("\n")
+                            out.append(f"    Missing: {', '.join(data['headers_missing'])}\n")
+                out.append("\n")
             
-            f.write("\n" + "=" * 80 + "\n\n")
+            out.append("\n" + rule + "\n")
+            f.write(''.join(out))
     
     return str(report_file)
 
 
-def generate_json_report(results, output_dir, timestamp):
+def generate_json_report(results, output_dir, timestamp, view=None):
     """
     Generate JSON report
+    Output is identical to json.dump(results, f, indent=2), written one
+    target at a time
     """
     report_file = Path(output_dir) / f"report_{timestamp}.json"
     
-    with open(report_file, 'w') as f:
-        json.dump(results, f, indent=2)
+    with open(report_file, 'w', buffering=WRITE_BUFFER) as f:
+        if not results:
+            f.write('{}')
+            return str(report_file)
+        
+        f.write('{')
+        for i, (key, value) in enumerate(results.items()):
+            f.write((',' if i else '') + '\n  ' + _json_key(key) + ': ')
+            
+            if isinstance(value, dict) and value:
+                # Stage dictionaries: encode and write each target separately
+                f.write('{')
+                for j, (target, data) in enumerate(value.items()):
+                    f.write((',' if j else '') + '\n    ' + _json_key(target) + ': ' + _pretty_json(data, '\n    '))
+                f.write('\n  }')
+            else:
+                f.write(_pretty_json(value, '\n  '))
+        f.write('\n}')
     
     return str(report_file)
 
 
-def generate_csv_report(results, output_dir, timestamp):
+def _json_key(key):
+    if isinstance(key, str):
+        return encode_basestring_ascii(key)
+    return encode_basestring_ascii(json.dumps(key).strip('"'))
+
+
+def _pretty_json(value, newline):
+    """
+    Encode value as json.dumps(value, indent=2) would, nested at `newline`
+    Strings and flat records (the bulk of every report) take fast paths
+    """
+    if type(value) is str:
+        return encode_basestring_ascii(value)
+    
+    inner = newline + '  '
+    
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return '[]'
+        
+        kinds = set(map(type, value))
+        if kinds == {str}:
+            return '[' + inner + (',' + inner).join(map(encode_basestring_ascii, value)) + newline + ']'
+        if kinds == {dict}:
+            encoded = _records_json(value, newline)
+            if encoded is not None:
+                return encoded
+        
+        parts = [inner + _pretty_json(item, inner) for item in value]
+        return '[' + ','.join(parts) + newline + ']'
+    
+    if isinstance(value, dict):
+        return _pretty_json_dict(value, newline)
+    
+    return json.dumps(value)
+
+
+def _pretty_json_dict(value, newline):
+    if not value:
+        return '{}'
+    inner = newline + '  '
+    parts = [inner + _json_key(key) + ': ' + _pretty_json(item, inner) for key, item in value.items()]
+    return '{' + ','.join(parts) + newline + '}'
+
+
+def _records_json(records, newline):
+    """
+    Encode a list of same-shaped flat dicts column by column
+    Each field is encoded for all records at once and the results are
+    filled into a per-shape template. Returns None if the records differ
+    in keys or hold values other than str, int or lists of str.
+    """
+    keys = tuple(records[0])
+    if not keys or any(type(key) is not str for key in keys):
+        return None
+    if any(tuple(record) != keys for record in records):
+        return None
+    
+    inner = newline + '  '
+    field = inner + '  '
+    columns = []
+    for key in keys:
+        column = _json_column([record[key] for record in records], field)
+        if column is None:
+            return None
+        columns.append(column)
+    
+    template = '{' + ','.join(field + encode_basestring_ascii(key).replace('%', '%%') + ': %s' for key in keys) + inner + '}'
+    return '[' + ','.join([inner + template % row for row in zip(*columns)]) + newline + ']'
+
+
+def _json_column(values, newline):
+    """
+    Encode one field of every record, or return None for unsupported types
+    """
+    kinds = set(map(type, values))
+    if kinds == {str}:
+        return list(map(encode_basestring_ascii, values))
+    if kinds == {int}:
+        return list(map(int.__repr__, values))
+    if kinds == {list}:
+        item_sep = newline + '  '
+        joiner = ',' + item_sep
+        close = newline + ']'
+        encoded = []
+        for items in values:
+            if not items:
+                encoded.append('[]')
+            elif set(map(type, items)) == {str}:
+                encoded.append('[' + item_sep + joiner.join(map(encode_basestring_ascii, items)) + close)
+            else:
+                return None
+        return encoded
+    return None
+
+
+def generate_csv_report(results, output_dir, timestamp, view=None):
     """
     Generate CSV report for live hosts
     """
+    view = view or ReportView(results)
     report_file = Path(output_dir) / f"live_hosts_{timestamp}.csv"
     
-    with open(report_file, 'w', newline='') as f:
-        fieldnames = ['target', 'url', 'status_code', 'title', 'technologies']
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
+    with open(report_file, 'w', newline='', buffering=WRITE_BUFFER) as f:
+        writer = csv.writer(f)
+        writer.writerow(['target', 'url', 'status_code', 'title', 'technologies'])
         
-        for target in results['targets']:
-            if target in results['live_hosts']:
-                for host in results['live_hosts'][target]:
-                    writer.writerow({
-                        'target': target,
-                        'url': host['url'],
-                        'status_code': host['status_code'],
-                        'title': host.get('title', ''),
-                        'technologies': ', '.join(host.get('tech', []))
-                    })
-    
-    return str(report_file)
\ No newline at end of file
+        for target in view.targets:
+            if target in view.live_hosts:
+                writer.writerows(
+                    (target, host['url'], host['status_code'], host.get('title', ''), ', '.join(host.get('tech', [])))
+                    for host in view.live_hosts[target]
+                )
+    
+    return str(report_file)
@@ -0,0 +1,252 @@
+"""
+Scope and exclusion matching
+
+Domain rules are stored in a trie keyed by reversed labels and CIDR rules
+in a binary prefix tree, so matching a name costs O(labels) or O(address
+bits) no matter how many rules are loaded.
+
+Rule syntax (one per line):
+    example.com        exact host
+    *.example.com      any subdomain of example.com
+    10.0.0.0/8         any address in the network (a bare IP is a /32 or /128)
+"""
+
+import ipaddress
+import socket
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Resolved hostnames remembered by a ScopeMatcher; least recently used go first
+RESOLVE_CACHE_SIZE = 10000
+
+
+class DomainTrie:
+    """
+    Reversed-label trie for exact and wildcard domain rules
+    """
+    
+    _EXACT = '$exact'
+    _WILDCARD = '$wildcard'
+
+    def __init__(self):
+        self.root = {}
+        self.size = 0
+
+    def add(self, pattern):
+        """Add a domain rule"""
+        pattern = pattern.strip().lower().rstrip('.')
+        wildcard = pattern.startswith('*.') or pattern.startswith('.')
+        pattern = pattern.lstrip('*').lstrip('.')
+        if not pattern:
+            return
+        
+        node = self.root
+        for label in reversed(pattern.split('.')):
+            node = node.setdefault(label, {})
+        node[self._WILDCARD if wildcard else self._EXACT] = True
+        self.size += 1
+
+    def match(self, name):
+        """
+        True if name equals an exact rule or falls under a wildcard rule
+        """
+        labels = name.strip().lower().rstrip('.').split('.')
+        node = self.root
+        
+        for depth, label in enumerate(reversed(labels)):
+            node = node.get(label)
+            if node is None:
+                return False
+            if self._WILDCARD in node and depth < len(labels) - 1:
+                return True
+        
+        return self._EXACT in node
+
+
+class CidrTree:
+    """
+    Binary prefix tree of IPv4 and IPv6 networks
+    """
+    
+    _END = 'end'
+
+    def __init__(self):
+        self.roots = {4: {}, 6: {}}
+        self.size = 0
+
+    def add(self, cidr):
+        """Add a network rule"""
+        network = ipaddress.ip_network(cidr.strip(), strict=False)
+        bits = int(network.network_address)
+        width = network.max_prefixlen
+        
+        node = self.roots[network.version]
+        for i in range(network.prefixlen):
+            node = node.setdefault((bits >> (width - 1 - i)) & 1, {})
+        node[self._END] = True
+        self.size += 1
+
+    def match(self, address):
+        """
+        True if address lies inside any stored network
+        """
+        ip = ipaddress.ip_address(address)
+        bits = int(ip)
+        width = ip.max_prefixlen
+        
+        node = self.roots[ip.version]
+        for i in range(width):
+            if self._END in node:
+                return True
+            node = node.get((bits >> (width - 1 - i)) & 1)
+            if node is None:
+                return False
+        
+        return self._END in node
+
+
+class RuleSet:
+    """
+    Domain and CIDR rules loaded from a single list
+    """
+
+    def __init__(self, rules=()):
+        self.domains = DomainTrie()
+        self.networks = CidrTree()
+        
+        for rule in rules:
+            rule = rule.strip()
+            if not rule or rule.startswith('#'):
+                continue
+            if is_ip_rule(rule):
+                self.networks.add(rule)
+            else:
+                self.domains.add(rule)
+
+    def __bool__(self):
+        return bool(self.domains.size or self.networks.size)
+
+    def match_name(self, name):
+        """True if a hostname or IP matches a rule"""
+        if is_ip_rule(name):
+            return self.networks.match(name)
+        return self.domains.match(name)
+
+    def match_addresses(self, addresses):
+        """True if any resolved address matches a CIDR rule"""
+        return any(self.networks.match(addr) for addr in addresses)
+
+
+class ScopeMatcher:
+    """
+    Decide whether a host is in scope and not excluded
+    An empty scope list allows everything that is not excluded
+    
+    A hostname can only be matched against CIDR rules through DNS, so it
+    is kept until it is checked with resolve=True:
+    
+    >>> scope = ScopeMatcher(['127.0.0.0/8'])
+    >>> scope.filter(['localhost', 'host.invalid'])
+    ['localhost', 'host.invalid']
+    >>> scope.filter(['localhost', 'host.invalid'], resolve=True)
+    ['localhost']
+    >>> ScopeMatcher(['127.0.0.0/8'], ['localhost']).filter(['localhost'])
+    []
+    """
+
+    def __init__(self, scope_rules=(), exclude_rules=()):
+        self.scope = RuleSet(scope_rules)
+        self.exclude = RuleSet(exclude_rules)
+        self._resolved = OrderedDict()
+        self._resolved_lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(self.scope or self.exclude)
+
+    def allows(self, name, resolve=False):
+        """
+        Check a hostname or IP against the rules
+        With resolve=True hostnames are also checked by their DNS
+        addresses against CIDR rules; without it, a hostname that only
+        a scope CIDR could match is given the benefit of the doubt
+        """
+        name = name.strip().lower()
+        
+        if self.exclude.match_name(name):
+            return False
+        
+        in_scope = not self.scope or self.scope.match_name(name)
+        
+        if not resolve and not is_ip_rule(name):
+            return in_scope or bool(self.scope.networks.size)
+        
+        if resolve and self._needs_addresses(name, in_scope):
+            addresses = self._resolve(name)
+            if self.exclude.match_addresses(addresses):
+                return False
+            if not in_scope:
+                in_scope = self.scope.match_addresses(addresses)
+        
+        return in_scope
+
+    def needs_dns(self, name):
+        """
+        True if only a DNS lookup can settle whether a hostname is allowed
+        """
+        name = name.strip().lower()
+        return self._needs_addresses(name, not self.scope or self.scope.match_name(name))
+
+    def _needs_addresses(self, name, in_scope):
+        return not is_ip_rule(name) and bool(
+            self.exclude.networks.size or (not in_scope and self.scope.networks.size)
+        )
+
+    def filter(self, names, resolve=False, threads=50):
+        """
+        Returns the names that are allowed, preserving order
+        DNS lookups needed with resolve=True run on a thread pool
+        """
+        if not self:
+            return list(names)
+        
+        names = list(names)
+        if resolve and (self.scope.networks.size or self.exclude.networks.size):
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                allowed = list(pool.map(lambda name: self.allows(name, resolve=True), names))
+            return [name for name, ok in zip(names, allowed) if ok]
+        
+        return [name for name in names if self.allows(name, resolve)]
+
+    def _resolve(self, name):
+        with self._resolved_lock:
+            addresses = self._resolved.get(name)
+            if addresses is not None:
+                self._resolved.move_to_end(name)
+                return addresses
+        
+        # Look up outside the lock so the filter's thread pool resolves in parallel
+        try:
+            infos = socket.getaddrinfo(name, None)
+            addresses = {info[4][0] for info in infos}
+        except (socket.gaierror, UnicodeError):
+            addresses = set()
+        
+        with self._resolved_lock:
+            self._resolved[name] = addresses
+            self._resolved.move_to_end(name)
+            while len(self._resolved) > RESOLVE_CACHE_SIZE:
+                self._resolved.popitem(last=False)
+        return addresses
+
+
+def is_ip_rule(value):
+    """
+    True if value is an IP address or CIDR network
+    """
+    try:
+        ipaddress.ip_network(value.strip(), strict=False)
+        return True
+    except ValueError:
+        return False
@@ -0,0 +1,261 @@
+"""
+Long-running scan daemon
+
+A JobManager keeps a warm worker pool and runs scan jobs through a
+runner callable supplied by reconx.py. Jobs for the same domain and
+options that are still queued or running are coalesced into one. The
+HTTP API is served on a TCP address or a Unix socket:
+
+    POST /jobs                {"domain": "example.com", "ports": true}
+    GET  /jobs                list jobs
+    GET  /jobs/<id>           job status
+    GET  /jobs/<id>/result    results of a finished job
+    GET  /health              daemon status
+"""
+
+import json
+import os
+import socketserver
+import stat
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Options a job may set, with their defaults
+JOB_OPTIONS = {
+    'ports': False,
+    'headers': False,
+    'prioritize': False,
+    'max_runtime': None,
+    'output': 'json'
+}
+
+# Largest accepted request body
+MAX_BODY = 64 * 1024
+
+# Seconds between writes of the shared HTTP cache
+CACHE_SAVE_INTERVAL = 60
+
+
+class JobManager:
+    """
+    Queue, coalesce and run scan jobs on a fixed pool of worker threads
+    """
+
+    def __init__(self, runner, workers=4, keep_finished=1000):
+        self.runner = runner
+        self.keep_finished = keep_finished
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='reconx-job')
+        self.jobs = {}
+        self.active = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def submit(self, domain, options):
+        """
+        Queue a job, or join an identical one that has not finished yet
+        Returns (job, coalesced)
+        """
+        domain = domain.strip().lower().rstrip('.')
+        key = (domain, tuple(sorted(options.items())))
+        
+        with self._lock:
+            existing = self.active.get(key)
+            if existing:
+                existing['requests'] += 1
+                return existing, True
+            
+            job = {
+                'id': uuid.uuid4().hex[:12],
+                'domain': domain,
+                'options': options,
+                'status': 'queued',
+                'requests': 1,
+                'submitted': time.time(),
+                'started': None,
+                'finished': None,
+                'error': None,
+                'result': None
+            }
+            self.jobs[job['id']] = job
+            self.active[key] = job
+        
+        self.pool.submit(self._run, job, key)
+        return job, False
+
+    def _run(self, job, key):
+        job['status'] = 'running'
+        job['started'] = time.time()
+        
+        try:
+            job['result'] = self.runner(job)
+            job['status'] = 'done'
+        except Exception as e:
+            job['status'] = 'failed'
+            job['error'] = str(e)
+        except SystemExit as e:
+            # A runner calling sys.exit() must not leave the job running forever
+            job['status'] = 'failed'
+            job['error'] = f"job exited with status {e.code}"
+        finally:
+            job['finished'] = time.time()
+            with self._lock:
+                self.active.pop(key, None)
+                self._prune()
+
+    def _prune(self):
+        finished = [job for job in self.jobs.values() if job['finished']]
+        for job in sorted(finished, key=lambda j: j['finished'])[:max(0, len(finished) - self.keep_finished)]:
+            del self.jobs[job['id']]
+
+    def get(self, job_id):
+        """Returns a job by id, or None"""
+        return self.jobs.get(job_id)
+
+    def list(self):
+        """Returns summaries of all known jobs"""
+        with self._lock:
+            return [job_summary(job) for job in self.jobs.values()]
+
+    def health(self):
+        """Returns uptime and job counts by status"""
+        with self._lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+        return {'status': 'ok', 'uptime': round(time.time() - self.started, 1), 'jobs': counts}
+
+    def shutdown(self):
+        """Stop accepting work and drop queued jobs"""
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def job_summary(job):
+    """
+    Job status without its (possibly large) results
+    """
+    summary = {key: value for key, value in job.items() if key != 'result'}
+    if job['result'] is not None:
+        summary['reports'] = job['result'].get('reports', [])
+    return summary
+
+
+class ReconRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API over the JobManager
+    """
+    
+    manager = None
+    validate = None
+    server_version = 'ReconX'
+
+    def do_GET(self):
+        parts = [part for part in self.path.split('?')[0].split('/') if part]
+        
+        if parts == ['health']:
+            return self._send(200, self.manager.health())
+        if parts == ['jobs']:
+            return self._send(200, {'jobs': self.manager.list()})
+        
+        if len(parts) in (2, 3) and parts[0] == 'jobs':
+            job = self.manager.get(parts[1])
+            if job is None:
+                return self._send(404, {'error': 'job not found'})
+            if len(parts) == 2:
+                return self._send(200, job_summary(job))
+            if parts[2] == 'result':
+                if job['status'] != 'done':
+                    return self._send(409, {'error': f"job is {job['status']}", 'status': job['status']})
+                return self._send(200, job['result'])
+        
+        self._send(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path.split('?')[0].rstrip('/') != '/jobs':
+            return self._send(404, {'error': 'not found'})
+        
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            if length > MAX_BODY:
+                return self._send(413, {'error': 'request too large'})
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except (ValueError, json.JSONDecodeError):
+            return self._send(400, {'error': 'invalid JSON body'})
+        
+        if not isinstance(body, dict):
+            return self._send(400, {'error': 'expected a JSON object'})
+        
+        domain = body.get('domain')
+        if not isinstance(domain, str) or not self.validate(domain.strip().rstrip('.')):
+            return self._send(400, {'error': 'missing or invalid domain'})
+        
+        unknown = set(body) - set(JOB_OPTIONS) - {'domain'}
+        if unknown:
+            return self._send(400, {'error': f"unknown options: {', '.join(sorted(unknown))}"})
+        
+        options = {name: body.get(name, default) for name, default in JOB_OPTIONS.items()}
+        for name, default in JOB_OPTIONS.items():
+            if isinstance(default, bool) and not isinstance(options[name], bool):
+                return self._send(400, {'error': f"{name} must be true or false"})
+        if options['output'] not in ('txt', 'json', 'csv', 'all'):
+            return self._send(400, {'error': 'output must be txt, json, csv or all'})
+        # bool is a subclass of int; true must not pass as a runtime
+        if options['max_runtime'] is not None and not (type(options['max_runtime']) is int and options['max_runtime'] > 0):
+            return self._send(400, {'error': 'max_runtime must be a positive integer'})
+        
+        job, coalesced = self.manager.submit(domain, options)
+        response = job_summary(job)
+        response['coalesced'] = coalesced
+        self._send(202, response)
+
+    def _send(self, code, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return str(self.client_address[0])
+        return 'unix'
+
+    def log_message(self, format, *args):
+        print(f"[*] {self.address_string()} {format % args}")
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    HTTP server on a Unix domain socket
+    """
+    
+    daemon_threads = True
+
+
+def create_server(manager, validate, listen=None, socket_path=None):
+    """
+    Build the API server on a Unix socket if given, otherwise on host:port
+    Raises ValueError if socket_path exists and is not a socket
+    """
+    handler = type('Handler', (ReconRequestHandler,), {
+        'manager': manager,
+        'validate': staticmethod(validate)
+    })
+    
+    if socket_path:
+        if os.path.exists(socket_path):
+            # Only replace a stale socket, never a file the path points at by mistake
+            if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+                raise ValueError(f"{socket_path} exists and is not a socket")
+            os.unlink(socket_path)
+        server = ThreadingUnixHTTPServer(socket_path, handler)
+        os.chmod(socket_path, 0o600)
+        return server
+    
+    host, _, port = (listen or '127.0.0.1:8787').rpartition(':')
+    return ThreadingHTTPServer((host or '127.0.0.1', int(port)), handler)
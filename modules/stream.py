@@ -0,0 +1,74 @@
+"""
+NDJSON event stream for downstream consumers
+"""
+
+import json
+import threading
+from datetime import datetime, timezone
+
+
+# Header scores below this are reported as weak (see README: < 4/7 is poor)
+WEAK_HEADER_SCORE = 4
+
+
+class EventStream:
+    """
+    Write one JSON object per finding, flushed as soon as it is produced
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self._lock = threading.Lock()
+
+    def emit(self, event, target, **fields):
+        """
+        Write a single event line
+        """
+        record = {
+            'event': event,
+            'target': target,
+            'time': datetime.now(timezone.utc).isoformat(timespec='milliseconds')
+        }
+        record.update(fields)
+        line = json.dumps(record, separators=(',', ':'))
+        
+        with self._lock:
+            self.out.write(line + "\n")
+            self.out.flush()
+
+    def subdomains(self, target, subdomains):
+        """Emit one event per discovered subdomain"""
+        for sub in subdomains:
+            self.emit('subdomain', target, subdomain=sub)
+
+    def live_host(self, target, host):
+        """Emit a live host found by httpx"""
+        self.emit(
+            'live_host', target,
+            url=host['url'],
+            status_code=host['status_code'],
+            title=host.get('title', ''),
+            tech=host.get('tech', [])
+        )
+
+    def open_ports(self, target, host, ports):
+        """Emit one event per open port on a host"""
+        for port in ports:
+            self.emit(
+                'open_port', target,
+                host=host,
+                port=port['port'],
+                protocol=port['protocol'],
+                service=port['service']
+            )
+
+    def header_result(self, target, url, data):
+        """Emit a weak_headers event if the URL scored poorly"""
+        if 'error' in data or data['security_score'] >= WEAK_HEADER_SCORE:
+            return
+        self.emit(
+            'weak_headers', target,
+            url=url,
+            score=data['security_score'],
+            missing=data['headers_missing']
+        )
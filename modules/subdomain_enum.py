@@ -2,13 +2,16 @@
 Subdomain enumeration using subfinder
 """
 
-import subprocess
 from pathlib import Path
+from modules.utils import run_command
 
 
-def enumerate_subdomains(domain, output_dir, silent=False):
+def enumerate_subdomains(domain, output_dir, silent=False, timeout=300, on_truncated=None, on_result=None):
     """
     Enumerate subdomains using subfinder
+    If subfinder runs out of time, the names it already printed are kept
+    and on_truncated (if given) is called
+    on_result, if given, is called with each new subdomain as subfinder prints it
     Returns list of discovered subdomains
     """
     output_file = Path(output_dir) / f"{domain}_subdomains.txt"
@@ -26,14 +29,22 @@ def enumerate_subdomains(domain, output_dir, silent=False):
         if not silent:
             print(f"    Running: subfinder -d {domain}")
         
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minutes timeout
-        )
+        printed = set()
         
-        if result.returncode != 0:
+        def on_line(line):
+            sub = line.strip()
+            if sub and sub not in printed:
+                printed.add(sub)
+                on_result(sub)
+        
+        result = run_command(cmd, timeout=timeout, on_line=on_line if on_result else None)
+        
+        if result.timed_out:
+            if not silent:
+                print(f"[!] Subfinder timeout for {domain}, keeping partial results")
+            if on_truncated:
+                on_truncated()
+        elif result.returncode != 0:
             if not silent:
                 print(f"[!] Subfinder error: {result.stderr}")
             return []
@@ -43,24 +54,29 @@ def enumerate_subdomains(domain, output_dir, silent=False):
             with open(output_file, 'r') as f:
                 subdomains = [line.strip() for line in f if line.strip()]
         
+        # subfinder only writes its output file on exit; fall back to stdout
+        seen = set(subdomains)
+        for line in result.stdout.splitlines():
+            sub = line.strip()
+            if sub and sub not in seen:
+                seen.add(sub)
+                subdomains.append(sub)
+        
         # Also add the main domain
         if domain not in subdomains:
             subdomains.insert(0, domain)
-            # Update file
-            with open(output_file, 'w') as f:
-                for sub in subdomains:
-                    f.write(f"{sub}\n")
+        
+        # Update file
+        with open(output_file, 'w') as f:
+            for sub in subdomains:
+                f.write(f"{sub}\n")
         
         return subdomains
         
-    except subprocess.TimeoutExpired:
-        if not silent:
-            print(f"[!] Subfinder timeout for {domain}")
-        return []
     except FileNotFoundError:
         print("[!] Subfinder not found. Install with: go install -v github.com/projectdiscovery/subfinder/v2/cmd/subfinder@latest")
         return []
     except Exception as e:
         if not silent:
             print(f"[!] Error in subdomain enumeration: {str(e)}")
-        return []
\ No newline at end of file
+        return []
@@ -4,9 +4,15 @@ Utility functions for ReconX
 
 import os
 import shutil
+import subprocess
+import threading
+from collections import namedtuple
 from pathlib import Path
 
 
+CommandResult = namedtuple('CommandResult', ['returncode', 'stdout', 'stderr', 'timed_out'])
+
+
 def check_dependencies():
     """
     Check if required CLI tools are installed
@@ -69,4 +75,56 @@ def validate_domain(domain):
     """
     import re
     pattern = r'^(?:[a-zA-Z0-9](?:[a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}$'
-    return re.match(pattern, domain) is not None
\ No newline at end of file
+    return re.match(pattern, domain) is not None
+
+
+def run_command(cmd, timeout=None, on_line=None, grace=5):
+    """
+    Run a command, keeping whatever it printed if it runs out of time
+    On timeout the process gets SIGTERM, then SIGKILL after grace seconds
+    on_line, if given, is called with each stdout line as it arrives
+    Returns CommandResult(returncode, stdout, stderr, timed_out)
+    """
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    
+    # Drain stderr in the background so a chatty tool cannot block on it
+    stderr_chunks = []
+    reader = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+    reader.start()
+    
+    timed_out = threading.Event()
+
+    def expire():
+        timed_out.set()
+        process.terminate()
+        try:
+            process.wait(grace)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    
+    timer = None
+    if timeout is not None:
+        timer = threading.Timer(max(timeout, 0), expire)
+        timer.daemon = True
+        timer.start()
+    
+    lines = []
+    try:
+        for line in process.stdout:
+            lines.append(line)
+            if on_line:
+                on_line(line)
+        process.wait()
+    finally:
+        if timer:
+            timer.cancel()
+        process.stdout.close()
+    
+    reader.join(grace)
+    
+    return CommandResult(process.returncode, ''.join(lines), ''.join(stderr_chunks), timed_out.is_set())
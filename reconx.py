@@ -8,19 +8,41 @@ Purpose: Authorized penetration testing and bug bounty reconnaissance
 import argparse
 import sys
 import os
+import signal
+import threading
+import requests
 from pathlib import Path
 from datetime import datetime
 from modules.banner import print_banner
 from modules.subdomain_enum import enumerate_subdomains
-from modules.http_probe import probe_http
+from modules.http_probe import probe_http, HttpxBatcher
 from modules.port_scan import scan_ports
 from modules.header_check import check_security_headers
 from modules.report import generate_report
-from modules.utils import setup_output_dir, load_targets, check_dependencies
+from modules.archive import ResultArchive, ArchiveReader, STAGES
+from modules.stream import EventStream
+from modules.scope import ScopeMatcher
+from modules.dedup import RunDeduplicator, collapse_targets, subdomains_under
+from modules.budget import RunBudget
+from modules.priority import load_prioritizer, save_history
+from modules.http_cache import HttpCache
+from modules.server import JobManager, create_server, CACHE_SAVE_INTERVAL
+from modules.utils import setup_output_dir, load_targets, check_dependencies, validate_domain
 
 
-def parse_arguments():
-    """Parse command line arguments"""
+def positive_int(value):
+    """argparse type for a whole number greater than zero"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {number}")
+    return number
+
+
+def build_parser():
+    """Build the command line parser for a scan"""
     parser = argparse.ArgumentParser(
         description='ReconX - Automated Reconnaissance & Asset Discovery',
         epilog='Example: reconx -d example.com --ports --headers'
@@ -48,12 +70,78 @@ def parse_arguments():
         action='store_true',
         help='Check HTTP security headers'
     )
+    parser.add_argument(
+        '--http-cache',
+        help='Cache file for header checks; later runs send conditional requests'
+    )
+    parser.add_argument(
+        '--cache-ttl',
+        type=int,
+        default=86400,
+        help='Seconds a cached redirect chain is replayed (default: 86400)'
+    )
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=10000,
+        help='Max URLs kept in the HTTP cache (default: 10000)'
+    )
     parser.add_argument(
         '--threads',
         type=int,
         default=50,
         help='Number of threads for HTTP probing (default: 50)'
     )
+    parser.add_argument(
+        '--dedup',
+        action='store_true',
+        help='Process overlapping targets, subdomains and endpoints only once'
+    )
+    parser.add_argument(
+        '--max-runtime',
+        type=positive_int,
+        help='Overall time limit in seconds, shared across targets and stages'
+    )
+    parser.add_argument(
+        '--prioritize',
+        action='store_true',
+        help='Probe and scan high-value hosts (admin, api, dev, vpn...) first'
+    )
+    parser.add_argument(
+        '--priority-config',
+        help='JSON file of keyword weights and scoring options (implies --prioritize)'
+    )
+    parser.add_argument(
+        '--history',
+        help='History file of earlier runs used for scoring and updated after this one (implies --prioritize)'
+    )
+    parser.add_argument(
+        '--batch-probe',
+        action='store_true',
+        help='Probe subdomains of all targets in a few large httpx runs'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=5000,
+        help='Max subdomains per batched httpx run (default: 5000)'
+    )
+    parser.add_argument(
+        '--flush-interval',
+        type=int,
+        default=300,
+        help='Seconds before a partial batch is probed (default: 300)'
+    )
+    
+    # Scope options
+    parser.add_argument(
+        '--scope',
+        help='File of in-scope rules: domains, *.wildcards, IPs or CIDRs'
+    )
+    parser.add_argument(
+        '--exclude',
+        help='File of out-of-scope rules (same syntax as --scope)'
+    )
     
     # Output options
     parser.add_argument(
@@ -67,6 +155,11 @@ def parse_arguments():
         default='output',
         help='Output directory (default: ./output)'
     )
+    parser.add_argument(
+        '--archive',
+        action='store_true',
+        help='Store results as a compressed, indexed archive (see: reconx export)'
+    )
     
     # Behavior options
     parser.add_argument(
@@ -79,14 +172,607 @@ def parse_arguments():
         action='store_true',
         help='Disable ASCII banner'
     )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Emit NDJSON finding events on stdout (progress moves to stderr)'
+    )
+    
+    return parser
+
+
+def parse_arguments(argv=None):
+    """Parse command line arguments"""
+    return build_parser().parse_args(argv)
+
+
+class ReconRun:
+    """
+    State shared by every stage of a single reconnaissance run
+    """
+
+    def __init__(self, args, output_dir, targets, timestamp, stream=None, scope=None,
+                 http_cache=None, prioritizer=None, session=None):
+        self.args = args
+        self.output_dir = output_dir
+        self.silent = args.silent
+        self.results = {
+            'targets': targets,
+            'subdomains': {},
+            'live_hosts': {},
+            'ports': {},
+            'headers': {},
+            'timestamp': timestamp
+        }
+        self.archive = ResultArchive(output_dir, timestamp, targets) if args.archive else None
+        # Per-stage files are redundant when everything lands in the archive
+        self.save_files = self.archive is None
+        self.stream = stream
+        self.scope = scope or ScopeMatcher()
+        self.dedup = RunDeduplicator() if args.dedup else None
+        self.parents = {}
+        if self.dedup:
+            _, self.parents = collapse_targets(targets)
+        
+        self.stages = ['subdomains', 'live_hosts']
+        if args.ports:
+            self.stages.append('ports')
+        if args.headers:
+            self.stages.append('headers')
+        
+        # Long-lived callers (reconx serve) pass in warm, shared instances and persist them
+        self.session = session
+        self.http_cache = http_cache
+        self.owns_http_cache = False
+        if self.http_cache is None and args.http_cache and args.headers:
+            self.http_cache = HttpCache(args.http_cache, args.cache_ttl, args.cache_size)
+            self.owns_http_cache = True
+        
+        self.prioritizer = prioritizer
+        if self.prioritizer is None and (args.prioritize or args.priority_config or args.history):
+            self.prioritizer = load_prioritizer(args.priority_config, args.history)
+        
+        self.budget = None
+        if args.max_runtime:
+            self.budget = RunBudget(args.max_runtime, len(targets), self.stages)
+            self.results['truncated'] = self.budget.truncated
+
+    def ordered_targets(self):
+        """Targets in processing order: parents before the children reusing them"""
+        targets = self.results['targets']
+        if not self.parents:
+            return list(targets)
+        return sorted(targets, key=lambda target: target.count('.'))
+
+    def record(self, stage, target, value):
+        """Store a stage's results for a target"""
+        self.results[stage][target] = value
+        if self.archive:
+            self.archive.write(target, stage, value)
+
+    def stage_timeout(self, stage, default=None):
+        """Timeout for a stage: its share of the run budget, capped at default"""
+        if not self.budget:
+            return default
+        return self.budget.allot(stage, default=default)
+
+    def skip_stages(self, stages):
+        """Give the budget of stages that will not run back to the others"""
+        if self.budget:
+            self.budget.release(stages)
+
+    def truncation_callback(self, target, stage):
+        """Callback for modules to report a stage cut short by the budget"""
+        if not self.budget:
+            return None
+        return lambda: self.budget.mark_truncated(target, stage)
+
+    def finish(self):
+        """Persist run-level metadata once every target is done"""
+        if self.args.history:
+            save_history(self.args.history, self.results)
+        
+        # Written once per run rather than after every target
+        if self.owns_http_cache:
+            self.http_cache.save()
+        
+        if self.archive and self.budget:
+            for target, stages in self.budget.truncated.items():
+                self.archive.write(target, 'truncated', stages)
+
+
+def print_target_header(target):
+    """Print the per-target section header"""
+    print(f"\n{'='*60}")
+    print(f"[*] Processing target: {target}")
+    print(f"{'='*60}\n")
+
+
+def run_enumeration(run, target):
+    """
+    Step 1: enumerate subdomains for a target
+    Returns list of subdomains
+    """
+    if not run.silent:
+        print(f"[1/4] Enumerating subdomains for {target}...")
+    
+    if run.budget and run.budget.expired():
+        print(f"[!] Time budget exhausted, skipping {target}\n")
+        for stage in run.stages:
+            run.budget.mark_truncated(target, stage)
+        run.skip_stages(run.stages)
+        return []
+    
+    parent = run.parents.get(target)
+    parent_subdomains = run.results['subdomains'].get(parent)
+    if parent_subdomains and run.budget and 'subdomains' in run.budget.truncated.get(parent, []):
+        # A cut-short parent enumeration may be missing this target's names
+        parent_subdomains = None
+    
+    # Stream each in-scope name as subfinder prints it, not after it exits.
+    # Names that need a DNS lookup against CIDR rules are left to the pooled
+    # filter below, so lookups never stall the reader of subfinder's output.
+    streamed = set()
+    on_subdomain = None
+    if run.stream:
+        def on_subdomain(sub):
+            if not run.scope.needs_dns(sub) and run.scope.allows(sub):
+                streamed.add(sub)
+                run.stream.emit('subdomain', target, subdomain=sub)
+    
+    if parent_subdomains:
+        # The parent's enumeration already covers everything under this target
+        if not run.silent:
+            print(f"    Reusing enumeration of parent target {parent}")
+        subdomains = subdomains_under(parent_subdomains, target)
+        run.skip_stages(['subdomains'])
+    else:
+        subdomains = enumerate_subdomains(
+            target, run.output_dir, run.silent,
+            timeout=run.stage_timeout('subdomains', 300),
+            on_truncated=run.truncation_callback(target, 'subdomains'),
+            on_result=on_subdomain
+        )
+    
+    if run.scope:
+        found = len(subdomains)
+        # Resolve here so names outside scope CIDRs never reach httpx
+        subdomains = run.scope.filter(subdomains, resolve=True, threads=run.args.threads)
+        if not run.silent and found != len(subdomains):
+            print(f"    Dropped {found - len(subdomains)} out-of-scope subdomains")
+    
+    run.record('subdomains', target, subdomains)
+    
+    if run.stream:
+        # The target itself, names checked by DNS, names only in subfinder's
+        # output file, or a reused parent enumeration
+        run.stream.subdomains(target, [sub for sub in subdomains if sub not in streamed])
+    
+    if not run.silent:
+        print(f"[✓] Found {len(subdomains)} subdomains\n")
+    
+    if not subdomains:
+        print(f"[!] No subdomains found for {target}, skipping...\n")
+        run.skip_stages(run.stages[1:])
+    
+    return subdomains
+
+
+def process_live_hosts(run, target, live_hosts):
+    """
+    Steps 3 and 4: port scan and header check on a target's live hosts
+    """
+    args = run.args
+    dedup = run.dedup
+    
+    # Step 3: Port Scanning (optional)
+    if args.ports:
+        if not run.silent:
+            print(f"[3/4] Scanning ports on live hosts...")
+        
+        on_ports = (lambda host, ports: run.stream.open_ports(target, host, ports)) if run.stream else None
+        host_filter = (lambda host: run.scope.allows(host, resolve=True)) if run.scope else None
+        scan_hosts = dedup.unscanned_hosts(live_hosts) if dedup else live_hosts
+        port_results = scan_ports(
+            scan_hosts, run.output_dir, run.silent,
+            save=run.save_files, on_result=on_ports, host_filter=host_filter,
+            timeout=run.stage_timeout('ports'),
+            on_truncated=run.truncation_callback(target, 'ports')
+        )
+        if dedup:
+            dedup.add_ports(scan_hosts, port_results)
+            scanned = port_results
+            port_results = dedup.ports_for(live_hosts)
+            if run.stream:
+                # Hosts scanned under another owning target are still this target's findings
+                for host, ports in port_results.items():
+                    if host not in scanned:
+                        run.stream.open_ports(target, host, ports)
+        run.record('ports', target, port_results)
+        
+        if not run.silent:
+            print(f"[✓] Port scan completed\n")
+    else:
+        if not run.silent:
+            print(f"[3/4] Port scanning disabled (use --ports to enable)\n")
+    
+    # Step 4: Security Headers Check (optional)
+    if args.headers:
+        if not run.silent:
+            print(f"[4/4] Checking security headers...")
+        
+        on_headers = (lambda url, data: run.stream.header_result(target, url, data)) if run.stream else None
+        check_hosts = dedup.unchecked_hosts(live_hosts) if dedup else live_hosts
+        header_results = check_security_headers(
+            check_hosts, run.output_dir, run.silent,
+            save=run.save_files, on_result=on_headers,
+            timeout=run.stage_timeout('headers'),
+            on_truncated=run.truncation_callback(target, 'headers'),
+            cache=run.http_cache,
+            session=run.session
+        )
+        if dedup:
+            dedup.add_headers(check_hosts, header_results)
+            checked = header_results
+            header_results = dedup.headers_for(live_hosts)
+            if run.stream:
+                for url, data in header_results.items():
+                    if url not in checked:
+                        run.stream.header_result(target, url, data)
+        run.record('headers', target, header_results)
+        
+        if not run.silent:
+            print(f"[✓] Security headers check completed\n")
+    else:
+        if not run.silent:
+            print(f"[4/4] Security headers check disabled (use --headers to enable)\n")
+
+
+def stream_shared_hosts(run, target, probed, owned):
+    """
+    Emit live_host events for owned hosts another target probed first
+    Returns owned
+    """
+    if run.stream:
+        probed_urls = {host['url'] for host in probed}
+        for host in owned:
+            if host['url'] not in probed_urls:
+                run.stream.live_host(target, host)
+    return owned
+
+
+def process_target(run, target):
+    """
+    Run the full pipeline for a single target
+    """
+    print_target_header(target)
+    
+    # Step 1: Subdomain Enumeration
+    subdomains = run_enumeration(run, target)
+    if not subdomains:
+        return
+    
+    # Step 2: HTTP Probing
+    if not run.silent:
+        print(f"[2/4] Probing live hosts...")
+    
+    probe_subdomains = run.dedup.claim_subdomains(target, subdomains) if run.dedup else subdomains
+    if run.prioritizer:
+        probe_subdomains = run.prioritizer.order(probe_subdomains)
+    
+    on_host = (lambda host: run.stream.live_host(target, host)) if run.stream else None
+    live_hosts = probe_http(
+        probe_subdomains, run.output_dir, run.args.threads, run.silent,
+        save=run.save_files, on_result=on_host,
+        timeout=run.stage_timeout('live_hosts', 600),
+        on_truncated=run.truncation_callback(target, 'live_hosts')
+    )
+    
+    if run.dedup:
+        run.dedup.add_live_hosts(live_hosts)
+        live_hosts = stream_shared_hosts(run, target, live_hosts, run.dedup.live_hosts_for(subdomains))
+    
+    if run.prioritizer:
+        live_hosts = run.prioritizer.order_hosts(live_hosts)
+    
+    run.record('live_hosts', target, live_hosts)
+    
+    if not run.silent:
+        print(f"[✓] Found {len(live_hosts)} live hosts\n")
+    
+    if not live_hosts:
+        print(f"[!] No live hosts found for {target}, skipping...\n")
+        run.skip_stages(run.stages[2:])
+        return
+    
+    process_live_hosts(run, target, live_hosts)
+
+
+def process_targets_batched(run, targets):
+    """
+    Run the pipeline with HTTP probing batched across all targets
+    """
+    args = run.args
+    batcher = HttpxBatcher(
+        run.output_dir,
+        threads=args.threads,
+        silent=run.silent,
+        batch_size=args.batch_size,
+        flush_interval=args.flush_interval,
+        save=run.save_files,
+        on_result=run.stream.live_host if run.stream else None,
+        budget=run.budget,
+        on_truncated=(lambda target: run.budget.mark_truncated(target, 'live_hosts')) if run.budget else None,
+        order=run.prioritizer.order if run.prioritizer else None
+    )
+    
+    # Step 1: enumerate every target, feeding the shared batch
+    for target in run.ordered_targets():
+        print_target_header(target)
+        
+        subdomains = run_enumeration(run, target)
+        if subdomains:
+            # Claim before queueing: a flushed batch forgets what it probed
+            if run.dedup:
+                subdomains = run.dedup.claim_subdomains(target, subdomains)
+            batcher.add(target, subdomains)
+    
+    # Step 2: probe whatever is still queued
+    if not run.silent:
+        print(f"[2/4] Probing live hosts across {len(batcher.results)} target(s)...")
+    
+    live_results = batcher.close()
+    
+    # Register every probe first; a target may own hosts another target probed
+    if run.dedup:
+        for hosts in live_results.values():
+            run.dedup.add_live_hosts(hosts)
+    
+    for target in targets:
+        if target not in live_results:
+            continue
+        
+        live_hosts = live_results[target]
+        if run.dedup:
+            owned = run.dedup.live_hosts_for(run.results['subdomains'][target])
+            live_hosts = stream_shared_hosts(run, target, live_hosts, owned)
+        if run.prioritizer:
+            live_hosts = run.prioritizer.order_hosts(live_hosts)
+        run.record('live_hosts', target, live_hosts)
+        
+        print_target_header(target)
+        
+        if not run.silent:
+            print(f"[✓] Found {len(live_hosts)} live hosts\n")
+        
+        if not live_hosts:
+            print(f"[!] No live hosts found for {target}, skipping...\n")
+            run.skip_stages(run.stages[2:])
+            continue
+        
+        process_live_hosts(run, target, live_hosts)
+
+
+def export_archive(argv):
+    """
+    Convert a result archive into txt/json/csv reports
+    """
+    parser = argparse.ArgumentParser(
+        prog='reconx export',
+        description='Convert a ReconX result archive into reports'
+    )
+    parser.add_argument(
+        'archive',
+        help='Archive file (results_*.jsonl.gz) or its .idx index'
+    )
+    parser.add_argument(
+        '-t', '--target',
+        action='append',
+        help='Only export this target (repeatable)'
+    )
+    parser.add_argument(
+        '-o', '--output',
+        choices=['txt', 'json', 'csv', 'all'],
+        default='txt',
+        help='Output format (default: txt)'
+    )
+    parser.add_argument(
+        '--output-dir',
+        default='output',
+        help='Output directory (default: ./output)'
+    )
+    args = parser.parse_args(argv)
+    
+    try:
+        reader = ArchiveReader(args.archive)
+    except FileNotFoundError as e:
+        print(f"[!] Archive not found: {e.filename}")
+        sys.exit(1)
+    
+    if args.target:
+        results = {'targets': args.target}
+        for stage in STAGES:
+            results[stage] = {}
+            for target in args.target:
+                data = reader.read(target, stage)
+                if data is not None:
+                    results[stage][target] = data
+        
+        # Keep the "results are partial" markers a full export would carry
+        for target in args.target:
+            truncated = reader.read(target, 'truncated')
+            if truncated is not None:
+                results.setdefault('truncated', {})[target] = truncated
+        results['timestamp'] = reader.timestamp
+    else:
+        results = reader.load_results()
+    
+    output_dir = setup_output_dir(args.output_dir)
+    report_files = generate_report(results, output_dir, args.output, reader.timestamp)
+    
+    print("[✓] Export completed!")
+    for report_file in report_files:
+        print(f"    - {report_file}")
+
+
+def serve(argv):
+    """
+    Run ReconX as a daemon that accepts scan jobs over a local HTTP API
+    """
+    parser = argparse.ArgumentParser(
+        prog='reconx serve',
+        description='Run a ReconX daemon with a local job API'
+    )
+    listen_group = parser.add_mutually_exclusive_group()
+    listen_group.add_argument(
+        '--listen',
+        default='127.0.0.1:8787',
+        help='TCP address to listen on (default: 127.0.0.1:8787)'
+    )
+    listen_group.add_argument(
+        '--socket',
+        help='Listen on this Unix socket instead of TCP'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='Concurrent scan jobs (default: 4)'
+    )
+    parser.add_argument(
+        '--threads',
+        type=int,
+        default=50,
+        help='Number of threads for HTTP probing per job (default: 50)'
+    )
+    parser.add_argument(
+        '--output-dir',
+        default='output',
+        help='Directory for per-job output (default: ./output)'
+    )
+    parser.add_argument('--scope', help='File of in-scope rules applied to every job')
+    parser.add_argument('--exclude', help='File of out-of-scope rules applied to every job')
+    parser.add_argument('--http-cache', help='HTTP cache file shared by all jobs')
+    parser.add_argument('--cache-ttl', type=int, default=86400, help='See reconx --help')
+    parser.add_argument('--cache-size', type=int, default=10000, help='See reconx --help')
+    parser.add_argument('--history', help='History file shared by all prioritized jobs')
+    args = parser.parse_args(argv)
+    
+    # One-time setup that every CLI invocation would otherwise repeat
+    missing_deps = check_dependencies()
+    if missing_deps:
+        print(f"[!] Missing dependencies: {', '.join(missing_deps)}")
+        sys.exit(1)
+    
+    output_dir = setup_output_dir(args.output_dir)
+    
+    scope_rules = []
+    exclude_rules = []
+    for path, rules in ((args.scope, scope_rules), (args.exclude, exclude_rules)):
+        if path:
+            rules.extend(load_targets(path))
+            if not rules:
+                print(f"[!] No valid rules found in {path}")
+                sys.exit(1)
+    scope = ScopeMatcher(scope_rules, exclude_rules)
+    http_cache = HttpCache(args.http_cache, args.cache_ttl, args.cache_size) if args.http_cache else None
+    prioritizer = load_prioritizer(None, args.history)
+    
+    # One requests session per worker thread keeps connections warm between jobs
+    sessions = threading.local()
+
+    def worker_session():
+        if not hasattr(sessions, 'session'):
+            sessions.session = requests.Session()
+        return sessions.session
+
+    def run_job(job):
+        options = job['options']
+        job_dir = setup_output_dir(output_dir / 'jobs' / job['id'])
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        # Start from the CLI defaults and set validated options directly
+        job_args = build_parser().parse_args(['-d', job['domain']])
+        job_args.silent = True
+        job_args.no_banner = True
+        job_args.threads = args.threads
+        job_args.ports = options['ports']
+        job_args.headers = options['headers']
+        job_args.max_runtime = options['max_runtime']
+        job_args.history = args.history if options['prioritize'] else None
+        
+        run = ReconRun(
+            job_args, job_dir, [job['domain']], timestamp,
+            scope=scope,
+            http_cache=http_cache,
+            prioritizer=prioritizer if options['prioritize'] else None,
+            session=worker_session()
+        )
+        process_target(run, job['domain'])
+        run.finish()
+        
+        # Later jobs score against the history this one just recorded
+        if options['prioritize'] and args.history:
+            prioritizer.add_history(run.results)
+        
+        # Forking report workers from a threaded daemon is unsafe; render inline
+        reports = generate_report(run.results, job_dir, options['output'], timestamp, workers=1)
+        return {'results': run.results, 'reports': reports}
+    
+    # The shared cache is written periodically and at shutdown, not after every job
+    stop_saving = threading.Event()
+
+    def save_cache_periodically():
+        while not stop_saving.wait(CACHE_SAVE_INTERVAL):
+            http_cache.save()
+    
+    if http_cache:
+        threading.Thread(target=save_cache_periodically, name='reconx-cache', daemon=True).start()
+    
+    manager = JobManager(run_job, workers=args.workers)
+    try:
+        server = create_server(manager, validate_domain, listen=args.listen, socket_path=args.socket)
+    except ValueError as e:
+        print(f"[!] Cannot listen: {str(e)}")
+        manager.shutdown()
+        sys.exit(1)
     
-    return parser.parse_args()
+    # Service managers stop daemons with SIGTERM; clean up the same way as Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
+    print(f"[*] ReconX daemon listening on {args.socket or args.listen} with {args.workers} worker(s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[*] Shutting down...")
+    finally:
+        server.server_close()
+        manager.shutdown()
+        stop_saving.set()
+        if http_cache:
+            http_cache.save()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
 
 
 def main():
     """Main execution flow"""
+    if len(sys.argv) > 1 and sys.argv[1] == 'export':
+        export_archive(sys.argv[2:])
+        return
+    
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        serve(sys.argv[2:])
+        return
+    
     args = parse_arguments()
     
+    # In stream mode stdout carries only events; everything else goes to stderr
+    stream = None
+    if args.stream:
+        stream = EventStream(sys.stdout)
+        sys.stdout = sys.stderr
+    
     # Display banner
     if not args.no_banner and not args.silent:
         print_banner()
@@ -117,87 +803,52 @@ def main():
             print(f"[!] No valid targets found in {args.list}")
             sys.exit(1)
     
+    # Load scope rules
+    scope_rules = []
+    exclude_rules = []
+    for path, rules in ((args.scope, scope_rules), (args.exclude, exclude_rules)):
+        if path:
+            rules.extend(load_targets(path))
+            if not rules:
+                print(f"[!] No valid rules found in {path}")
+                sys.exit(1)
+    scope = ScopeMatcher(scope_rules, exclude_rules)
+    
     print(f"[*] Loaded {len(targets)} target(s)")
+    if scope:
+        print(f"[*] Scope rules: {len(scope_rules)} in scope, {len(exclude_rules)} excluded")
     print(f"[*] Output directory: {output_dir}\n")
     
     # Results storage
-    all_results = {
-        'targets': targets,
-        'subdomains': {},
-        'live_hosts': {},
-        'ports': {},
-        'headers': {},
-        'timestamp': timestamp
-    }
+    run = ReconRun(args, output_dir, targets, timestamp, stream, scope)
     
     # Process each target
-    for target in targets:
-        print(f"\n{'='*60}")
-        print(f"[*] Processing target: {target}")
-        print(f"{'='*60}\n")
-        
-        # Step 1: Subdomain Enumeration
-        if not args.silent:
-            print(f"[1/4] Enumerating subdomains for {target}...")
-        
-        subdomains = enumerate_subdomains(target, output_dir, args.silent)
-        all_results['subdomains'][target] = subdomains
-        
-        if not args.silent:
-            print(f"[✓] Found {len(subdomains)} subdomains\n")
-        
-        if not subdomains:
-            print(f"[!] No subdomains found for {target}, skipping...\n")
-            continue
-        
-        # Step 2: HTTP Probing
-        if not args.silent:
-            print(f"[2/4] Probing live hosts...")
-        
-        live_hosts = probe_http(subdomains, output_dir, args.threads, args.silent)
-        all_results['live_hosts'][target] = live_hosts
-        
-        if not args.silent:
-            print(f"[✓] Found {len(live_hosts)} live hosts\n")
-        
-        if not live_hosts:
-            print(f"[!] No live hosts found for {target}, skipping...\n")
-            continue
-        
-        # Step 3: Port Scanning (optional)
-        if args.ports:
-            if not args.silent:
-                print(f"[3/4] Scanning ports on live hosts...")
-            
-            port_results = scan_ports(live_hosts, output_dir, args.silent)
-            all_results['ports'][target] = port_results
-            
-            if not args.silent:
-                print(f"[✓] Port scan completed\n")
-        else:
-            if not args.silent:
-                print(f"[3/4] Port scanning disabled (use --ports to enable)\n")
-        
-        # Step 4: Security Headers Check (optional)
-        if args.headers:
-            if not args.silent:
-                print(f"[4/4] Checking security headers...")
-            
-            header_results = check_security_headers(live_hosts, output_dir, args.silent)
-            all_results['headers'][target] = header_results
-            
-            if not args.silent:
-                print(f"[✓] Security headers check completed\n")
-        else:
-            if not args.silent:
-                print(f"[4/4] Security headers check disabled (use --headers to enable)\n")
+    if args.batch_probe:
+        process_targets_batched(run, targets)
+    else:
+        for target in run.ordered_targets():
+            process_target(run, target)
+    
+    run.finish()
+    
+    if stream:
+        stream.emit('scan_complete', None, targets=len(targets), truncated=run.results.get('truncated', {}))
+    
+    if run.archive:
+        print("[✓] Reconnaissance completed!")
+        print(f"\n[*] Results archived to:")
+        print(f"    - {run.archive.path}")
+        print(f"    - {run.archive.index_path}")
+        print(f"\n[*] Convert with: reconx export {run.archive.path} -o {args.output}")
+        print(f"\n[*] Total execution time: {datetime.now()}")
+        return
     
     # Generate final report
     print(f"\n{'='*60}")
     print("[*] Generating final report...")
     print(f"{'='*60}\n")
     
-    report_files = generate_report(all_results, output_dir, args.output, timestamp)
+    report_files = generate_report(run.results, output_dir, args.output, timestamp)
     
     print("[✓] Reconnaissance completed!")
     print(f"\n[*] Results saved to:")